@@ -1,6 +1,9 @@
 from flask import Flask, render_template, redirect, url_for
 from flask_login import login_required, current_user
 from datetime import datetime
+from markupsafe import Markup
+import importlib
+import logging
 import os
 from dotenv import load_dotenv
 
@@ -10,51 +13,136 @@ load_dotenv()
 # Import extensions and models
 from extensions import db, login_manager, mail
 from models import User, NotificationSettings, Project, Task, TeamMember, ChatMessage, TaskNote, Milestone, TaskDependency
+from utils.user_cache import load_user_snapshot, invalidate_user, orm_user
+from utils import log, metrics, query_audit, profiler, tracing
 
-app = Flask(__name__)
-app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'supportsphere-project-key-v2')
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///project_management.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-
-# Email Configuration
-app.config['MAIL_SERVER'] = os.getenv('MAIL_SERVER', 'smtp.gmail.com')
-app.config['MAIL_PORT'] = int(os.getenv('MAIL_PORT', 587))
-app.config['MAIL_USE_TLS'] = os.getenv('MAIL_USE_TLS', 'True') == 'True'
-app.config['MAIL_USE_SSL'] = os.getenv('MAIL_USE_SSL', 'False') == 'True'
-app.config['MAIL_USERNAME'] = os.getenv('MAIL_USERNAME')
-app.config['MAIL_PASSWORD'] = os.getenv('MAIL_PASSWORD')
-app.config['MAIL_DEFAULT_SENDER'] = os.getenv('MAIL_DEFAULT_SENDER', 'SupportSphere <noreply@supportsphere.com>')
-
-# Initialize extensions with app
-db.init_app(app)
-login_manager.init_app(app)
-mail.init_app(app)
-login_manager.login_view = 'auth.login'
-
-# Register blueprints
-from routes.auth import auth_bp
-from routes.manager import manager_bp
-from routes.team import team_bp
-from routes.customer import customer_bp
-from routes.notifications import notifications_bp
-from routes.chat import chat_bp
-
-app.register_blueprint(auth_bp, url_prefix='/auth')
-app.register_blueprint(manager_bp, url_prefix='/manager')
-app.register_blueprint(team_bp, url_prefix='/team')
-app.register_blueprint(customer_bp, url_prefix='/customer')
-app.register_blueprint(notifications_bp, url_prefix='/notifications')
-app.register_blueprint(chat_bp, url_prefix='/chat')
+logger = logging.getLogger(__name__)
+
+
+# (module, blueprint attribute, url prefix); imported only by apps that serve requests
+BLUEPRINTS = (
+    ('routes.auth', 'auth_bp', '/auth'),
+    ('routes.manager', 'manager_bp', '/manager'),
+    ('routes.team', 'team_bp', '/team'),
+    ('routes.customer', 'customer_bp', '/customer'),
+    ('routes.notifications', 'notifications_bp', '/notifications'),
+    ('routes.chat', 'chat_bp', '/chat'),
+    ('routes.health', 'health_bp', None),
+)
+
+
+def create_app(config=None, with_routes=True):
+    """
+    Build and configure the Flask application
+    
+    Args:
+        config: Optional mapping (or object) of settings applied over the
+                environment-based defaults
+        with_routes: Import and register the blueprints and pages. CLI tools
+                     pass False to get a database/mail context without
+                     loading any route modules
+    """
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'supportsphere-project-key-v2')
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///project_management.db')
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    
+    # Email Configuration
+    app.config['MAIL_SERVER'] = os.getenv('MAIL_SERVER', 'smtp.gmail.com')
+    app.config['MAIL_PORT'] = int(os.getenv('MAIL_PORT', 587))
+    app.config['MAIL_USE_TLS'] = os.getenv('MAIL_USE_TLS', 'True') == 'True'
+    app.config['MAIL_USE_SSL'] = os.getenv('MAIL_USE_SSL', 'False') == 'True'
+    app.config['MAIL_USERNAME'] = os.getenv('MAIL_USERNAME')
+    app.config['MAIL_PASSWORD'] = os.getenv('MAIL_PASSWORD')
+    app.config['MAIL_DEFAULT_SENDER'] = os.getenv('MAIL_DEFAULT_SENDER', 'SupportSphere <noreply@supportsphere.com>')
+    
+    # Compiled templates survive restarts when this points at a persistent directory
+    app.config['JINJA_BYTECODE_CACHE_DIR'] = os.getenv('JINJA_BYTECODE_CACHE_DIR')
+    
+    # JSON log lines on stdout; see utils/log.py
+    app.config['LOG_LEVEL'] = os.getenv('LOG_LEVEL', 'INFO')
+    
+    # Per-request query counts and N+1 detection: 'off', 'on' or 'strict'
+    app.config['SQL_AUDIT'] = os.getenv('SQL_AUDIT', 'off')
+    app.config['SQL_AUDIT_THRESHOLD'] = int(os.getenv('SQL_AUDIT_THRESHOLD', query_audit.DEFAULT_THRESHOLD))
+    
+    # On-demand request profiling; folded stacks are written to PROFILE_DIR
+    app.config['PROFILE_DIR'] = os.getenv('PROFILE_DIR') or os.path.join(app.instance_path, 'profiles')
+    app.config['PROFILE_SAMPLE_RATE'] = float(os.getenv('PROFILE_SAMPLE_RATE', 0))
+    app.config['PROFILE_INTERVAL_MS'] = float(os.getenv('PROFILE_INTERVAL_MS', profiler.DEFAULT_INTERVAL_MS))
+    
+    # Span tracing to an OTLP/JSON file; off unless TRACE_FILE is set
+    app.config['TRACE_FILE'] = os.getenv('TRACE_FILE')
+    app.config['TRACE_SAMPLE_RATE'] = float(os.getenv('TRACE_SAMPLE_RATE', 1.0))
+    
+    if isinstance(config, dict):
+        app.config.from_mapping(config)
+    elif config is not None:
+        app.config.from_object(config)
+    
+    # Initialize extensions with app
+    db.init_app(app)
+    mail.init_app(app)
+    
+    if not with_routes:
+        return app
+    
+    login_manager.init_app(app)
+    login_manager.login_view = 'auth.login'
+    
+    cache_dir = app.config['JINJA_BYTECODE_CACHE_DIR']
+    if cache_dir:
+        from jinja2 import FileSystemBytecodeCache
+        os.makedirs(cache_dir, exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(cache_dir)
+    
+    # Register blueprints
+    for module_name, attribute, url_prefix in BLUEPRINTS:
+        module = importlib.import_module(module_name)
+        app.register_blueprint(getattr(module, attribute), url_prefix=url_prefix)
+    
+    # query_audit first: it starts the per-request SQL count the others read
+    query_audit.init_app(app)
+    log.init_app(app)
+    tracing.init_app(app)
+    metrics.init_app(app)
+    profiler.init_app(app)
+    
+    # Template helpers and top-level pages defined below
+    for name in ('datetimeformat', 'dateformat', 'timeformat', 'timeuntil', 'escapejs'):
+        app.add_template_filter(globals()[name], name)
+    app.context_processor(inject_now)
+    
+    app.add_url_rule('/', 'home', home)
+    app.add_url_rule('/dashboard', 'dashboard', dashboard)
+    app.add_url_rule('/help', 'help', help)
+    app.add_url_rule('/profile', 'profile', profile, methods=['GET', 'POST'])
+    app.add_url_rule('/settings', 'settings', settings, methods=['GET', 'POST'])
+    
+    return app
+
+
+_app = None
+
+
+def __getattr__(name):
+    """Keep `from app import app` working: the module-level app is built on first use"""
+    global _app
+    if name == 'app':
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 @login_manager.user_loader
 def load_user(user_id):
-    return User.query.get(int(user_id))
+    # Served from the in-process snapshot cache; see utils/user_cache.py
+    return load_user_snapshot(int(user_id))
 
 
 # ==================== TEMPLATE FILTERS ====================
 
-@app.template_filter('datetimeformat')
 def datetimeformat(value, format='%Y-%m-%d %H:%M'):
     if not value:
         return ''
@@ -62,11 +150,12 @@ def datetimeformat(value, format='%Y-%m-%d %H:%M'):
         return value
     return value.strftime(format)
 
-@app.template_filter('dateformat')
 def dateformat(value):
     return datetimeformat(value, '%Y-%m-%d')
 
-@app.template_filter('timeuntil')
+def timeformat(value):
+    return datetimeformat(value, '%b %d, %H:%M')
+
 def timeuntil(value):
     if not value:
         return ''
@@ -81,14 +170,20 @@ def timeuntil(value):
     else:
         return 'Today'
 
-@app.context_processor
+# Characters that could end a JavaScript string or an HTML attribute around it
+_JS_ESCAPES = {ord(c): f'\\u{ord(c):04X}' for c in '\\\'"<>&=-;`\u2028\u2029'}
+_JS_ESCAPES.update((c, f'\\u{c:04X}') for c in range(32))
+
+def escapejs(value):
+    """Escape text for use inside a quoted JavaScript string in an HTML attribute"""
+    return Markup(str(value or '').translate(_JS_ESCAPES))
+
 def inject_now():
     return {'now': datetime.utcnow}
 
 
 # ==================== ROOT ROUTE ====================
 
-@app.route('/')
 def home():
     if current_user.is_authenticated:
         if current_user.role == 'manager':
@@ -100,7 +195,6 @@ def home():
     return render_template('pages/index.html')
 
 
-@app.route('/dashboard')
 @login_required
 def dashboard():
     """General dashboard route that redirects based on user role"""
@@ -115,14 +209,12 @@ def dashboard():
         return redirect(url_for('home'))
 
 
-@app.route('/help')
 def help():
     return render_template('pages/help.html')
 
 
 # ==================== PROFILE ROUTE ====================
 
-@app.route('/profile', methods=['GET', 'POST'])
 @login_required
 def profile():
     from flask import request, flash
@@ -159,18 +251,21 @@ def profile():
             
             try:
                 # Update user information
-                current_user.name = name
-                current_user.email = email
+                user = orm_user(current_user.id)
+                user.name = name
+                user.email = email
                 if avatar:
-                    current_user.avatar = avatar
+                    user.avatar = avatar
                 
                 db.session.commit()
+                invalidate_user(user.id)
                 flash('Profile updated successfully!', 'success')
+                return redirect(url_for('profile'))
                 
-            except Exception as e:
+            except Exception:
                 db.session.rollback()
                 flash('An error occurred while updating your profile.', 'danger')
-                print(f"Profile update error: {str(e)}")
+                logger.exception("Profile update error")
         
         # Change password
         elif action == 'change_password':
@@ -183,8 +278,10 @@ def profile():
                 flash('All password fields are required.', 'danger')
                 return render_template('pages/profile.html')
             
+            user = orm_user(current_user.id)
+            
             # Verify current password
-            if not current_user.check_password(current_password):
+            if not user.check_password(current_password):
                 flash('Current password is incorrect.', 'danger')
                 return render_template('pages/profile.html')
             
@@ -199,27 +296,27 @@ def profile():
                 return render_template('pages/profile.html')
             
             # Check if new password is different from current
-            if current_user.check_password(new_password):
+            if user.check_password(new_password):
                 flash('New password must be different from current password.', 'danger')
                 return render_template('pages/profile.html')
             
             try:
                 # Update password
-                current_user.set_password(new_password)
+                user.set_password(new_password)
                 db.session.commit()
                 flash('Password changed successfully!', 'success')
+                return redirect(url_for('profile'))
                 
-            except Exception as e:
+            except Exception:
                 db.session.rollback()
                 flash('An error occurred while changing your password.', 'danger')
-                print(f"Password change error: {str(e)}")
+                logger.exception("Password change error")
     
     return render_template('pages/profile.html')
 
 
 # ==================== SETTINGS ROUTE ====================
 
-@app.route('/settings', methods=['GET', 'POST'])
 @login_required
 def settings():
     from flask import request, flash
@@ -234,27 +331,36 @@ def settings():
         
         try:
             # Update theme preference
-            current_user.theme = theme
+            orm_user(current_user.id).theme = theme
             db.session.commit()
+            invalidate_user(current_user.id)
             flash(f'Theme changed to {theme} mode successfully!', 'success')
+            return redirect(url_for('settings'))
             
-        except Exception as e:
+        except Exception:
             db.session.rollback()
             flash('An error occurred while updating settings.', 'danger')
-            print(f"Settings update error: {str(e)}")
+            logger.exception("Settings update error")
     
     return render_template('pages/settings.html')
 
 
 # ==================== INITIALIZATION ====================
 
-def init_db():
+def init_db(app=None):
     """Initialize database with sample data"""
     from datetime import timedelta
     
+    app = app or __getattr__('app')
     with app.app_context():
         db.create_all()
         
+        # create_all skips tables that already exist, so add any indexes
+        # declared on the models since those tables were created
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(db.engine, checkfirst=True)
+        
         # Check if users exist
         if User.query.count() == 0:
             print("Creating sample data...")
@@ -411,6 +517,10 @@ def init_db():
 
 # ==================== RUN APP ====================
 
+# Development server only; production runs wsgi:app under gunicorn
+# (see gunicorn.conf.py)
+
 if __name__ == '__main__':
-    init_db()
+    app = create_app()
+    init_db(app)
     app.run(host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -1,9 +1,12 @@
+import logging
 from flask import Blueprint, render_template, redirect, url_for, request, flash
 from flask_login import login_user, logout_user, login_required, current_user
 from extensions import db
 from models import User, NotificationSettings
+from utils.cache import bump
 
 auth_bp = Blueprint('auth', __name__)
+logger = logging.getLogger(__name__)
 
 @auth_bp.route('/login', methods=['GET', 'POST'])
 def login():
@@ -120,14 +123,15 @@ def register():
             db.session.add(notification_settings)
             
             db.session.commit()
+            bump('user', user.id)
             
             flash(f'Registration successful! Welcome, {name}. Please login to continue.', 'success')
             return redirect(url_for('auth.login'))
             
-        except Exception as e:
+        except Exception:
             db.session.rollback()
             flash('An error occurred during registration. Please try again.', 'danger')
-            print(f"Registration error: {str(e)}")  # Log error for debugging
+            logger.exception("Registration error")
             return render_template('auth/register.html')
     
     return render_template('auth/register.html')
@@ -1,10 +1,15 @@
+import logging
 from flask import Blueprint, render_template, request, flash, redirect, url_for
 from flask_login import login_required, current_user
 from extensions import db
 from models import Project, ChatMessage
+from utils.projections import project_cards
+from utils.cache import bump, render_fragment, version
+from utils.access import invalidate_access
 from datetime import datetime
 
 customer_bp = Blueprint('customer', __name__)
+logger = logging.getLogger(__name__)
 
 @customer_bp.before_request
 @login_required
@@ -15,11 +20,15 @@ def require_customer():
 
 @customer_bp.route('/dashboard')
 def dashboard():
-    # Get customer's projects
-    projects = Project.query.filter_by(customer_id=current_user.id)\
-                           .order_by(Project.created_at.desc()).all()
+    # Get customer's projects, cached until any project changes
+    customer_id = current_user.id
+    projects_html = render_fragment('customer_projects', customer_id, (version('project'),),
+                                    'dashboard/fragments/customer_projects.html',
+                                    lambda: {'projects': project_cards(Project.customer_id == customer_id,
+                                                                       order_by=Project.created_at.desc(),
+                                                                       with_preview=True)})
     
-    return render_template('dashboard/customer_dashboard.html', projects=projects)
+    return render_template('dashboard/customer_dashboard.html', projects_html=projects_html)
 
 @customer_bp.route('/projects/new', methods=['GET', 'POST'])
 def new_project():
@@ -73,14 +82,16 @@ def new_project():
             
             db.session.add(project)
             db.session.commit()
+            bump('project', project.id)
+            invalidate_access(current_user.id)
             
             flash(f'Project "{title}" created successfully! Our team will review it shortly.', 'success')
             return redirect(url_for('customer.dashboard'))
             
-        except Exception as e:
+        except Exception:
             db.session.rollback()
             flash('An error occurred while creating your project. Please try again.', 'danger')
-            print(f"Project creation error: {str(e)}")
+            logger.exception("Project creation error")
             return render_template('project/create_project.html')
     
     return render_template('project/create_project.html')
@@ -1,11 +1,27 @@
-from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify, current_app
+import csv
+import logging
+from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify, current_app, get_template_attribute
 from flask_login import login_required, current_user
+from sqlalchemy.orm import load_only, joinedload
 from extensions import db, mail
-from models import User, Project, Task, TeamMember
-from utils.email_service import send_task_assignment_email, send_project_status_change_email
+from models import User, Project, Task, TeamMember, ProjectTemplate
+from utils.email_service import send_task_assignment_email, send_project_status_change_email, send_task_digest_emails
+from utils.projections import project_cards, project_status_counts, user_refs
+from utils.cache import bump, cached, render_fragment, render_rows, version
+from utils.access import invalidate_access
+from utils.events import team_member_added, team_member_removed, task_completed
+from utils.task_import import detect_format, iter_rows, import_tasks
+from utils.project_templates import save_template, instantiate_template, template_summaries
+from utils.dependency_graph import DependencyCycleError, project_graph, add_dependency, remove_dependency
+from utils.forecast import DEFAULT_SIMULATIONS, project_forecast
+from utils.assignment import AUTO, AutoAssigner, load_candidates
+from utils.workload import DEFAULT_WEEKS, team_workload
+from utils.tracing import span
+from utils.task_ops import BulkOperationError, parse_request, apply_bulk_operation, notification_groups, describe_operation
 from datetime import datetime
 
 manager_bp = Blueprint('manager', __name__)
+logger = logging.getLogger(__name__)
 
 @manager_bp.before_request
 @login_required
@@ -16,31 +32,52 @@ def require_manager():
 
 @manager_bp.route('/dashboard')
 def dashboard():
-    # Get all projects
-    projects = Project.query.order_by(Project.created_at.desc()).all()
-    
     # Get team members
-    team_members = User.query.filter_by(role='team_member', is_active=True).all()
+    team_members = user_refs('team_member')
     
     # Get customers for project creation form
-    customers = User.query.filter_by(role='customer', is_active=True).all()
-    
-    # Statistics
-    total_projects = len(projects)
-    in_progress = len([p for p in projects if p.status == 'In Progress'])
-    completed = len([p for p in projects if p.status == 'Completed'])
-    pending = len([p for p in projects if p.status == 'Pending'])
-    
-    stats = {
-        'total_projects': total_projects,
-        'in_progress': in_progress,
-        'completed': completed,
-        'pending': pending,
-        'team_count': len(team_members)
-    }
+    customers = user_refs('customer')
+    
+    # Statistics are cached until a project or user changes
+    versions = (version('project'), version('user'))
+    
+    def build_stats():
+        counts = project_status_counts()
+        return {
+            'total_projects': sum(counts.values()),
+            'in_progress': counts.get('In Progress', 0),
+            'completed': counts.get('Completed', 0),
+            'pending': counts.get('Pending', 0),
+            'team_count': len(team_members)
+        }
+    
+    stats = cached('manager_stats', None, versions, build_stats)
+    
+    stats_html = render_fragment('manager_stats_cards', None, versions,
+                                 'dashboard/fragments/manager_stats.html',
+                                 lambda: {'stats': stats})
+    
+    # Each project row is cached on its own, so a write to one project
+    # re-renders only that row
+    project_ids = cached('manager_project_ids', None, (version('project'),),
+                         lambda: db.session.scalars(db.select(Project.id)
+                                                    .order_by(Project.created_at.desc())).all())
+    
+    def load_rows(ids):
+        criteria = (Project.id.in_(ids),) if len(ids) < len(project_ids) else ()
+        return {card.id: card for card in project_cards(*criteria, with_members=True)}
+    
+    rows_template = 'dashboard/fragments/manager_project_rows.html'
+    if project_ids:
+        project_rows_html = render_rows('manager_project_row', project_ids,
+                                        lambda project_id: (version('project', project_id), version('user')),
+                                        rows_template, 'row', load_rows)
+    else:
+        project_rows_html = get_template_attribute(rows_template, 'empty')()
     
     return render_template('dashboard/manager_dashboard.html',
-                          projects=projects,
+                          stats_html=stats_html,
+                          project_rows_html=project_rows_html,
                           team_members=team_members,
                           customers=customers,
                           stats=stats)
@@ -86,6 +123,8 @@ def create_project():
     
     db.session.add(project)
     db.session.commit()
+    bump('project', project.id)
+    invalidate_access(project.customer_id)
     
     flash('Project created successfully!', 'success')
     return redirect(url_for('manager.dashboard'))
@@ -93,25 +132,44 @@ def create_project():
 @manager_bp.route('/project/<int:project_id>/assign-team', methods=['POST'])
 def assign_team(project_id):
     project = Project.query.get_or_404(project_id)
-    member_ids = request.form.getlist('team_members')
-    
-    # Clear existing assignments
-    TeamMember.query.filter_by(project_id=project_id).delete()
-    
-    # Add new assignments
-    for member_id in member_ids:
-        team_member = TeamMember(
-            project_id=project_id,
-            user_id=member_id,
-            role='Developer'  # Default role
-        )
-        db.session.add(team_member)
+    member_ids = request.form.getlist('team_members', type=int)
+    
+    # Only touch the memberships that actually changed, keeping
+    # assigned_at and role for everyone who stays on the team
+    current_ids = set(db.session.execute(
+        db.select(TeamMember.user_id).where(TeamMember.project_id == project_id)
+    ).scalars())
+    submitted_ids = set(db.session.execute(
+        db.select(User.id).where(User.id.in_(member_ids), User.role == 'team_member',
+                                 User.is_active == True)
+    ).scalars()) if member_ids else set()
+    added_ids = submitted_ids - current_ids
+    removed_ids = current_ids - submitted_ids
+    
+    if removed_ids:
+        db.session.execute(db.delete(TeamMember).where(
+            TeamMember.project_id == project_id,
+            TeamMember.user_id.in_(removed_ids)
+        ))
+    
+    if added_ids:
+        db.session.execute(db.insert(TeamMember), [{
+            'project_id': project_id,
+            'user_id': user_id,
+            'role': 'Developer'  # Default role
+        } for user_id in sorted(added_ids)])
     
     # Update project status
     if project.status == 'Pending':
         project.status = 'In Progress'
     
     db.session.commit()
+    bump('project', project_id)
+    
+    if added_ids:
+        team_member_added.send(project_id, user_ids=added_ids)
+    if removed_ids:
+        team_member_removed.send(project_id, user_ids=removed_ids)
     
     flash('Team assigned successfully!', 'success')
     return redirect(url_for('manager.project_detail', project_id=project_id))
@@ -123,24 +181,33 @@ def create_task():
     role = request.form.get('role')
     priority = request.form.get('priority')
     deadline_str = request.form.get('deadline')
-    project_id = request.form.get('project_id')
+    project_id = request.form.get('project_id', type=int)
     assignee_id = request.form.get('assignee_id')
+    estimated_hours = int(request.form.get('estimated_hours', 0, type=float))
     
     if not all([title, role, deadline_str, project_id]):
         flash('Required fields missing', 'danger')
         return redirect(request.referrer)
     
+    if db.session.get(Project, project_id) is None:
+        flash('Project not found', 'danger')
+        return redirect(request.referrer)
+    
     try:
         deadline = datetime.strptime(deadline_str, '%Y-%m-%d')
     except:
         flash('Invalid deadline format', 'danger')
         return redirect(request.referrer)
     
+    if assignee_id == AUTO:
+        assignee_id = AutoAssigner(project_id).pick(role, estimated_hours)
+    
     task = Task(
         title=title,
         description=description,
         role=role,
         priority=priority,
+        estimated_hours=estimated_hours,
         deadline=deadline,
         project_id=project_id,
         assignee_id=assignee_id if assignee_id else None,
@@ -149,6 +216,9 @@ def create_task():
     
     db.session.add(task)
     db.session.commit()
+    bump('project', task.project_id)
+    if task.assignee_id:
+        bump('assignee', task.assignee_id)
     
     # Send email notification if task is assigned
     if assignee_id:
@@ -157,12 +227,124 @@ def create_task():
             if assignee.notification_settings.should_send_email('task_assigned'):
                 try:
                     send_task_assignment_email(mail, current_app._get_current_object(), task, assignee)
-                except Exception as e:
-                    print(f"Error sending email notification: {str(e)}")
+                except Exception:
+                    logger.exception("Error sending email notification")
     
     flash('Task created successfully!', 'success')
     return redirect(url_for('manager.project_detail', project_id=project_id))
 
+@manager_bp.route('/project/<int:project_id>/assignment-candidates')
+def assignment_candidates(project_id):
+    """Team members ranked by how well they fit a new task of the given role"""
+    Project.query.get_or_404(project_id)
+    role = request.args.get('role', '')
+    candidates = sorted(load_candidates(project_id), key=lambda candidate: -candidate.score(role))
+    return jsonify({
+        'role': role,
+        'candidates': [dict(candidate.to_dict(), score=round(candidate.score(role), 1))
+                       for candidate in candidates]
+    })
+
+@manager_bp.route('/project/<int:project_id>/tasks/import', methods=['POST'])
+def import_project_tasks(project_id):
+    """Bulk-create tasks from a streamed CSV or JSON upload"""
+    project = Project.query.get_or_404(project_id)
+    requested_format = request.args.get('format')
+    
+    # Accept a multipart file field or a raw request body
+    upload = request.files.get('file')
+    if upload:
+        stream = upload.stream
+        fmt = detect_format(upload.filename, upload.mimetype, requested_format)
+    else:
+        stream = request.stream
+        fmt = detect_format(mimetype=request.mimetype, requested=requested_format)
+    
+    try:
+        summary = import_tasks(project_id, current_user.id, iter_rows(stream, fmt),
+                               auto_assign=request.args.get('auto_assign') == '1')
+    except (ValueError, UnicodeDecodeError, csv.Error) as e:
+        return jsonify({'error': f'Import failed: {str(e)}'}), 400
+    
+    if summary.imported:
+        bump('project', project_id)
+        for assignee_id in summary.assignments:
+            bump('assignee', assignee_id)
+    
+    # One summary email per assignee, all sent by a single background job
+    if summary.assignments:
+        assignees = User.query.options(joinedload(User.notification_settings))\
+                              .filter(User.id.in_(summary.assignments)).all()
+        digests = []
+        for assignee in assignees:
+            if assignee.notification_settings and assignee.notification_settings.should_send_email('task_assigned'):
+                count, titles = summary.assignments[assignee.id]
+                digests.append((
+                    assignee,
+                    f"{count} New Task{'s' if count != 1 else ''} Assigned: {project.title}",
+                    f"You have been assigned {count} new task{'s' if count != 1 else ''} in the {project.title} project.",
+                    titles,
+                    count
+                ))
+        try:
+            send_task_digest_emails(mail, current_app._get_current_object(), digests)
+        except Exception:
+            logger.exception("Error sending email notifications")
+    
+    return jsonify(summary.to_dict())
+
+@manager_bp.route('/project/<int:project_id>/save-template', methods=['POST'])
+def save_project_template(project_id):
+    """Save a project's tasks, milestones and dependencies as a template"""
+    project = Project.query.get_or_404(project_id)
+    name = (request.form.get('name') or project.title).strip()
+    
+    try:
+        template = save_template(project, name, current_user.id)
+    except Exception:
+        logger.exception("Error saving template")
+        flash('Could not save the project as a template', 'danger')
+        return redirect(url_for('manager.dashboard'))
+    
+    flash(f'Template "{template.name}" saved', 'success')
+    return redirect(url_for('manager.dashboard'))
+
+@manager_bp.route('/templates')
+def list_templates():
+    return jsonify({'templates': template_summaries()})
+
+@manager_bp.route('/templates/<int:template_id>/instantiate', methods=['POST'])
+def instantiate_project_template(template_id):
+    """Start a new project from a template, shifting deadlines to the start date"""
+    template = ProjectTemplate.query.get_or_404(template_id)
+    title = request.form.get('title') or template.name
+    customer_id = request.form.get('customer_id')
+    start_str = request.form.get('start_date')
+    
+    customer = User.query.filter_by(id=customer_id, role='customer').first() if customer_id else None
+    if not customer:
+        flash('Please select a customer', 'danger')
+        return redirect(url_for('manager.dashboard'))
+    
+    try:
+        start = datetime.strptime(start_str, '%Y-%m-%d') if start_str else None
+    except ValueError:
+        flash('Invalid start date format', 'danger')
+        return redirect(url_for('manager.dashboard'))
+    
+    try:
+        project = instantiate_template(template, title, customer.id, current_user.id, start)
+    except Exception:
+        logger.exception("Error instantiating template")
+        flash('Could not create a project from the template', 'danger')
+        return redirect(url_for('manager.dashboard'))
+    
+    bump('project', project.id)
+    invalidate_access(customer.id)
+    
+    flash(f'Project "{project.title}" created from template', 'success')
+    return redirect(url_for('manager.dashboard'))
+
 @manager_bp.route('/task/<int:task_id>/assign', methods=['POST'])
 def assign_task(task_id):
     task = Task.query.get_or_404(task_id)
@@ -173,6 +355,9 @@ def assign_task(task_id):
     task.status = 'In Progress'
     
     db.session.commit()
+    bump('project', task.project_id)
+    for user_id in {old_assignee_id, task.assignee_id} - {None}:
+        bump('assignee', user_id)
     
     # Send email notification to new assignee
     if assignee_id and assignee_id != old_assignee_id:
@@ -181,12 +366,121 @@ def assign_task(task_id):
             if assignee.notification_settings.should_send_email('task_assigned'):
                 try:
                     send_task_assignment_email(mail, current_app._get_current_object(), task, assignee)
-                except Exception as e:
-                    print(f"Error sending email notification: {str(e)}")
+                except Exception:
+                    logger.exception("Error sending email notification")
     
     flash('Task assigned successfully!', 'success')
     return redirect(request.referrer)
 
+@manager_bp.route('/tasks/bulk', methods=['POST'])
+def bulk_update_tasks():
+    """Reassign, change status of, or shift deadlines for many tasks at once"""
+    data = request.get_json(silent=True)
+    if data is None:
+        data = {
+            'task_ids': request.form.getlist('task_ids'),
+            'operation': request.form.get('operation'),
+            'assignee_id': request.form.get('assignee_id'),
+            'status': request.form.get('status'),
+            'days': request.form.get('days')
+        }
+    
+    try:
+        task_ids, operation, values = parse_request(data)
+    except BulkOperationError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    affected = apply_bulk_operation(task_ids, operation, values)
+    
+    for project_id in {task.project_id for task in affected}:
+        bump('project', project_id)
+    for user_id in {task.assignee_id for task in affected} - {None}:
+        bump('assignee', user_id)
+    
+    if operation == 'reassign':
+        bump('assignee', values['assignee_id'])
+    
+    # Completions go through the same unblock notifications as single updates
+    if operation == 'status' and values['status'] == 'Completed':
+        completed = tuple(task.id for task in affected if task.status != 'Completed')
+        if completed:
+            task_completed.send(completed)
+    
+    # One grouped email per affected user
+    setting, by_user = notification_groups(affected, operation, values, current_user.id)
+    users = User.query.options(joinedload(User.notification_settings))\
+                      .filter(User.id.in_(by_user)).all() if by_user else []
+    digests = []
+    for user in users:
+        if user.notification_settings and user.notification_settings.should_send_email(setting):
+            tasks = by_user[user.id]
+            digests.append((
+                user,
+                f"{len(tasks)} Task{'s' if len(tasks) != 1 else ''} Updated",
+                describe_operation(operation, values, len(tasks)),
+                [task.title for task in tasks[:10]],
+                len(tasks)
+            ))
+    
+    if digests:
+        try:
+            send_task_digest_emails(mail, current_app._get_current_object(), digests)
+        except Exception:
+            logger.exception("Error sending email notifications")
+    
+    return jsonify({
+        'operation': operation,
+        'updated': len(affected),
+        'not_found': len(task_ids) - len(affected)
+    })
+
+@manager_bp.route('/project/<int:project_id>/dependencies')
+def project_dependencies(project_id):
+    """Topological order, earliest/latest starts and critical path of a project's tasks"""
+    try:
+        graph = project_graph(project_id)
+    except DependencyCycleError as e:
+        return jsonify({'error': str(e)}), 409
+    if graph is None:
+        return jsonify({'error': 'Project not found'}), 404
+    return jsonify(graph.to_dict())
+
+@manager_bp.route('/project/<int:project_id>/forecast')
+def project_completion_forecast(project_id):
+    """P50/P90 completion dates from a Monte Carlo simulation of the remaining work"""
+    simulations = request.args.get('simulations', DEFAULT_SIMULATIONS, type=int)
+    try:
+        forecast = project_forecast(project_id, simulations)
+    except DependencyCycleError as e:
+        return jsonify({'error': str(e)}), 409
+    if forecast is None:
+        return jsonify({'error': 'Project not found'}), 404
+    return jsonify(forecast)
+
+@manager_bp.route('/task/<int:task_id>/dependencies', methods=['POST'])
+def add_task_dependency(task_id):
+    task = Task.query.get_or_404(task_id)
+    data = request.get_json(silent=True) or request.form
+    try:
+        depends_on = db.session.get(Task, int(data.get('depends_on_id')))
+    except (TypeError, ValueError):
+        depends_on = None
+    if not depends_on:
+        return jsonify({'error': 'depends_on_id must be an existing task'}), 400
+    
+    try:
+        add_dependency(task, depends_on)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 409
+    
+    return jsonify({'task_id': task.id, 'depends_on_id': depends_on.id})
+
+@manager_bp.route('/task/<int:task_id>/dependencies/<int:depends_on_id>/delete', methods=['POST'])
+def remove_task_dependency(task_id, depends_on_id):
+    task = Task.query.get_or_404(task_id)
+    remove_dependency(task, depends_on_id)
+    return jsonify({'task_id': task.id, 'removed': depends_on_id})
+
 @manager_bp.route('/project/<int:project_id>/update-status', methods=['POST'])
 def update_project_status(project_id):
     project = Project.query.get_or_404(project_id)
@@ -199,30 +493,35 @@ def update_project_status(project_id):
         project.completed_at = datetime.utcnow()
         project.progress = 100
     
-    db.session.commit()
+    with span('db.commit'):
+        db.session.commit()
+    bump('project', project_id)
     
     # Send email notifications to all project stakeholders
     if old_status != new_status:
-        recipients = []
-        
-        # Add customer
-        if project.customer:
-            recipients.append(project.customer)
-        
-        # Add manager
-        if project.manager and project.manager.id != current_user.id:
-            recipients.append(project.manager)
-        
-        # Add team members
-        for team_member in project.team_members:
-            if team_member.member:
-                recipients.append(team_member.member)
-        
-        # Filter recipients who want email notifications
-        email_recipients = [
-            r for r in recipients 
-            if r.notification_settings and r.notification_settings.should_send_email('project_status_change')
-        ]
+        with span('notifications.recipients') as recipients_span:
+            recipients = []
+            
+            # Add customer
+            if project.customer:
+                recipients.append(project.customer)
+            
+            # Add manager
+            if project.manager and project.manager.id != current_user.id:
+                recipients.append(project.manager)
+            
+            # Add team members
+            for team_member in project.team_members:
+                if team_member.member:
+                    recipients.append(team_member.member)
+            
+            # Filter recipients who want email notifications
+            email_recipients = [
+                r for r in recipients 
+                if r.notification_settings and r.notification_settings.should_send_email('project_status_change')
+            ]
+            if recipients_span is not None:
+                recipients_span.attributes['recipients'] = len(email_recipients)
         
         if email_recipients:
             try:
@@ -234,21 +533,26 @@ def update_project_status(project_id):
                     old_status, 
                     new_status
                 )
-            except Exception as e:
-                print(f"Error sending email notifications: {str(e)}")
+            except Exception:
+                logger.exception("Error sending email notifications")
     
     flash(f'Project status updated to {new_status}', 'success')
     return redirect(request.referrer)
 
 @manager_bp.route('/team-members')
 def team_members():
-    members = User.query.filter_by(role='team_member').all()
-    return render_template('team/team_members.html', members=members)
+    weeks = request.args.get('weeks', DEFAULT_WEEKS, type=int)
+    return render_template('team/team_members.html', workload=team_workload(weeks))
+
+@manager_bp.route('/team-members/workload')
+def team_workload_api():
+    """Per-member, per-week planned hours as JSON"""
+    return jsonify(team_workload(request.args.get('weeks', DEFAULT_WEEKS, type=int)))
 
 @manager_bp.route('/reports')
 def reports():
-    # Project analytics
-    projects = Project.query.all()
+    # Project analytics (only the status column is needed)
+    projects = Project.query.options(load_only(Project.status)).all()
     
     # Calculate metrics
     total_projects = len(projects)
@@ -258,7 +562,7 @@ def reports():
     completion_rate = (completed_projects / total_projects * 100) if total_projects > 0 else 0
     
     # Tasks by status
-    all_tasks = Task.query.all()
+    all_tasks = Task.query.options(load_only(Task.status)).all()
     tasks_by_status = {
         'pending': len([t for t in all_tasks if t.status == 'Pending']),
         'in_progress': len([t for t in all_tasks if t.status == 'In Progress']),
@@ -1,11 +1,17 @@
+import logging
 from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify, current_app
 from flask_login import login_required, current_user
 from extensions import db, mail
-from models import NotificationSettings
-from utils.email_service import send_email
+from sqlalchemy.orm import joinedload
+from models import NotificationSettings, Project, Task, User
+from utils.email_service import send_email, send_team_update_email, send_task_digest_emails
+from utils.events import team_member_added, team_member_removed, task_completed
+from utils.dependency_graph import newly_unblocked
+from utils.user_cache import invalidate_user
 from datetime import datetime
 
 notifications_bp = Blueprint('notifications', __name__)
+logger = logging.getLogger(__name__)
 
 @notifications_bp.route('/settings')
 @login_required
@@ -18,6 +24,7 @@ def settings():
         settings = NotificationSettings(user_id=current_user.id)
         db.session.add(settings)
         db.session.commit()
+        invalidate_user(current_user.id)
     
     return render_template('pages/notification_settings.html', settings=settings)
 
@@ -60,6 +67,7 @@ def update_settings():
         return redirect(url_for('notifications.settings'))
     
     db.session.commit()
+    invalidate_user(current_user.id)
     
     flash('Notification settings updated successfully!', 'success')
     return redirect(url_for('notifications.settings'))
@@ -92,6 +100,7 @@ def reset_settings():
         settings.quiet_hours_end = 8
         
         db.session.commit()
+        invalidate_user(current_user.id)
         
         flash('Notification settings reset to defaults!', 'success')
     
@@ -141,3 +150,64 @@ def test_email():
         flash(f'Error sending test email: {str(e)}', 'danger')
     
     return redirect(url_for('notifications.settings'))
+
+
+def notify_team_change(project_id, user_ids, added):
+    """Email only the members whose assignment changed"""
+    project = Project.query.get(project_id)
+    members = User.query.options(joinedload(User.notification_settings))\
+                        .filter(User.id.in_(user_ids)).all()
+    
+    for member in members:
+        if member.notification_settings and member.notification_settings.should_send_email('team_update'):
+            try:
+                send_team_update_email(mail, current_app._get_current_object(), project, member, added)
+            except Exception:
+                logger.exception("Error sending team update email")
+
+
+@team_member_added.connect
+def on_team_member_added(project_id, user_ids=(), **extra):
+    notify_team_change(project_id, user_ids, added=True)
+
+
+@team_member_removed.connect
+def on_team_member_removed(project_id, user_ids=(), **extra):
+    notify_team_change(project_id, user_ids, added=False)
+
+
+@task_completed.connect
+def on_task_completed(task_ids, **extra):
+    """Tell assignees about dependent tasks that the completions just unblocked"""
+    unblocked = newly_unblocked(task_ids)
+    by_user = {}
+    for row in unblocked:
+        if row.assignee_id:
+            by_user.setdefault(row.assignee_id, []).append(row.title)
+    if not by_user:
+        return
+    
+    if len(task_ids) == 1:
+        completed_title = db.session.execute(db.select(Task.title).where(Task.id == task_ids[0])).scalar()
+        reason = f'"{completed_title}" is complete'
+    else:
+        reason = f'{len(task_ids)} tasks were completed'
+    users = User.query.options(joinedload(User.notification_settings))\
+                      .filter(User.id.in_(by_user)).all()
+    digests = []
+    for user in users:
+        if user.notification_settings and user.notification_settings.should_send_email('task_completed'):
+            titles = by_user[user.id]
+            digests.append((
+                user,
+                f"{len(titles)} Task{'s' if len(titles) != 1 else ''} Unblocked",
+                f'{reason}, so these tasks have no remaining prerequisites.',
+                titles[:10],
+                len(titles)
+            ))
+    
+    if digests:
+        try:
+            send_task_digest_emails(mail, current_app._get_current_object(), digests)
+        except Exception:
+            logger.exception("Error sending unblocked task emails")
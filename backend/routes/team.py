@@ -1,8 +1,14 @@
 from flask import Blueprint, render_template, request, flash, redirect, url_for, jsonify
 from flask_login import login_required, current_user
+from sqlalchemy.orm import defer
 from extensions import db
 from models import Task, TaskNote, Project, TeamMember
+from utils.projections import project_cards, task_rows, task_notes_page
+from utils.cache import bump, render_fragment, version
+from utils.task_ops import recalculate_project_progress
+from utils.events import task_completed
 from datetime import datetime
+from functools import cache
 
 team_bp = Blueprint('team', __name__)
 
@@ -15,33 +21,49 @@ def require_team_member():
 
 @team_bp.route('/dashboard')
 def dashboard():
-    # Get assigned tasks
-    assigned_tasks = Task.query.filter_by(assignee_id=current_user.id)\
-                               .order_by(Task.deadline).all()
+    user_id = current_user.id
+    
+    # Get assigned tasks (read-only rows with each task's latest note),
+    # loaded at most once and only if a task fragment is not cached
+    @cache
+    def assigned_tasks():
+        return task_rows(Task.assignee_id == user_id,
+                         order_by=Task.deadline, with_latest_note=True)
     
     # Statistics
-    total_tasks = len(assigned_tasks)
-    completed = len([t for t in assigned_tasks if t.status == 'Completed'])
-    in_progress = len([t for t in assigned_tasks if t.status == 'In Progress'])
-    pending = len([t for t in assigned_tasks if t.status == 'Pending'])
+    def build_stats():
+        tasks = assigned_tasks()
+        return {'stats': {
+            'total_tasks': len(tasks),
+            'completed': len([t for t in tasks if t.status == 'Completed']),
+            'in_progress': len([t for t in tasks if t.status == 'In Progress']),
+            'pending': len([t for t in tasks if t.status == 'Pending']),
+            'overdue': len([t for t in tasks if t.is_overdue])
+        }}
+    
+    task_versions = (version('assignee', user_id),)
+    stats_html = render_fragment('team_stats', user_id, task_versions,
+                                 'dashboard/fragments/team_stats.html', build_stats)
+    task_list_html = render_fragment('team_task_list', user_id, task_versions,
+                                     'dashboard/fragments/team_task_list.html',
+                                     lambda: {'tasks': assigned_tasks()})
+    task_options_html = render_fragment('team_task_options', user_id, task_versions,
+                                        'dashboard/fragments/team_task_options.html',
+                                        lambda: {'tasks': assigned_tasks()})
     
     # Get projects user is assigned to
-    team_assignments = TeamMember.query.filter_by(user_id=current_user.id).all()
-    project_ids = [ta.project_id for ta in team_assignments]
-    projects = Project.query.filter(Project.id.in_(project_ids)).all() if project_ids else []
+    def load_projects():
+        assigned_project_ids = db.select(TeamMember.project_id).where(TeamMember.user_id == user_id)
+        return {'projects': project_cards(Project.id.in_(assigned_project_ids), with_manager=True)}
     
-    stats = {
-        'total_tasks': total_tasks,
-        'completed': completed,
-        'in_progress': in_progress,
-        'pending': pending,
-        'overdue': len([t for t in assigned_tasks if t.is_overdue])
-    }
+    projects_html = render_fragment('team_projects', user_id, (version('project'), version('user')),
+                                    'dashboard/fragments/team_projects.html', load_projects)
     
     return render_template('dashboard/team_dashboard.html',
-                          tasks=assigned_tasks,
-                          projects=projects,
-                          stats=stats)
+                          stats_html=stats_html,
+                          task_list_html=task_list_html,
+                          task_options_html=task_options_html,
+                          projects_html=projects_html)
 
 
 @team_bp.route('/projects')
@@ -49,7 +71,8 @@ def projects():
     # Get projects user is assigned to
     team_assignments = TeamMember.query.filter_by(user_id=current_user.id).all()
     project_ids = [ta.project_id for ta in team_assignments]
-    projects = Project.query.filter(Project.id.in_(project_ids)).all() if project_ids else []
+    projects = Project.query.filter(Project.id.in_(project_ids))\
+                            .options(defer(Project.description)).all() if project_ids else []
     
     return render_template('team/team_projects.html', projects=projects)
 
@@ -64,6 +87,30 @@ def task_detail(task_id):
     
     return render_template('tasks/task_detail.html', task=task)
 
+@team_bp.route('/task/<int:task_id>/notes')
+def get_notes(task_id):
+    """Paginated notes for the task detail page, newest first"""
+    task = Task.query.get_or_404(task_id)
+    
+    # Verify access
+    if task.assignee_id != current_user.id:
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    before = request.args.get('before', type=int, default=0)
+    limit = min(max(request.args.get('limit', type=int, default=20), 1), 100)
+    
+    notes, next_before = task_notes_page(task_id, before=before, limit=limit)
+    
+    return jsonify({
+        'notes': [{
+            'id': n.id,
+            'content': n.content,
+            'author': n.author_name or 'Unknown',
+            'timestamp': n.timestamp.strftime('%Y-%m-%d %H:%M')
+        } for n in notes],
+        'next_before': next_before
+    })
+
 @team_bp.route('/task/<int:task_id>/update-progress', methods=['POST'])
 def update_progress(task_id):
     task = Task.query.get_or_404(task_id)
@@ -80,6 +127,7 @@ def update_progress(task_id):
     if progress is not None:
         task.progress = progress
     
+    was_completed = task.status == 'Completed'
     if status:
         task.status = status
         if status == 'Completed':
@@ -99,6 +147,11 @@ def update_progress(task_id):
     
     # Update project progress
     update_project_progress(task.project_id)
+    bump('assignee', task.assignee_id)
+    bump('project', task.project_id)
+    
+    if task.status == 'Completed' and not was_completed:
+        task_completed.send((task.id,))
     
     flash('Task progress updated successfully!', 'success')
     return redirect(request.referrer or url_for('team.dashboard'))
@@ -122,15 +175,12 @@ def add_note(task_id):
         )
         db.session.add(note)
         db.session.commit()
+        bump('assignee', task.assignee_id)
         flash('Note added successfully!', 'success')
     
     return redirect(request.referrer)
 
 def update_project_progress(project_id):
     """Calculate and update project progress based on tasks"""
-    project = Project.query.get(project_id)
-    
-    if project and project.tasks:
-        total_progress = sum(task.progress for task in project.tasks)
-        project.progress = total_progress // len(project.tasks)
-        db.session.commit()
+    recalculate_project_progress([project_id])
+    db.session.commit()
\ No newline at end of file
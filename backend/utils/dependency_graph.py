@@ -0,0 +1,259 @@
+"""
+Task Dependency Graph for SupportSphere
+Builds a per-project dependency graph from TaskDependency and computes a
+topological order, earliest/latest start times and the critical path
+
+Edges point from a prerequisite to the task that depends on it and are
+stored as compressed adjacency arrays (offsets + targets) indexed by each
+task's position in the graph. Graphs are cached per project and rebuilt
+after the project's tasks or dependencies change.
+"""
+
+import os
+from array import array
+from collections import deque
+from datetime import timedelta
+
+from sqlalchemy import select, and_
+from sqlalchemy.orm import aliased
+
+from extensions import db
+from models import Project, Task, TaskDependency
+from utils.cache import LRUCache, bump, version
+
+_graphs = LRUCache(maxsize=int(os.getenv('GRAPH_CACHE_SIZE', 256)))
+
+
+class DependencyCycleError(ValueError):
+    """Raised when dependencies would form (or already form) a cycle"""
+
+
+def _adjacency(count, edges):
+    """Compressed adjacency arrays: targets of node i are targets[offsets[i]:offsets[i + 1]]"""
+    offsets = array('i', [0]) * (count + 1)
+    for source, _ in edges:
+        offsets[source + 1] += 1
+    for i in range(count):
+        offsets[i + 1] += offsets[i]
+    targets = array('i', [0]) * len(edges)
+    fill = array('i', offsets[:-1])
+    for source, target in edges:
+        targets[fill[source]] = target
+        fill[source] += 1
+    return offsets, targets
+
+
+class DependencyGraph:
+    """
+    Immutable dependency graph and schedule for one project
+
+    Times are in hours from the project's start (its created_at). A task's
+    latest finish is bounded by its own deadline and by the latest start of
+    the tasks depending on it, so negative slack means the task is already
+    scheduled to be late.
+    """
+    __slots__ = ('project_id', 'start', 'task_ids', 'index', 'durations',
+                 'succ_offsets', 'succ_targets', 'pred_offsets', 'pred_targets',
+                 'order', 'earliest_start', 'latest_start', 'critical_path')
+
+    def __init__(self, project_id, start, tasks, edges):
+        self.project_id = project_id
+        self.start = start
+        self.task_ids = array('i', (task_id for task_id, _, _ in tasks))
+        self.index = {task_id: i for i, task_id in enumerate(self.task_ids)}
+        self.durations = array('d', (float(hours or 0) for _, hours, _ in tasks))
+
+        pairs = [(self.index[prereq], self.index[dependent]) for prereq, dependent in edges]
+        self.succ_offsets, self.succ_targets = _adjacency(len(tasks), pairs)
+        self.pred_offsets, self.pred_targets = _adjacency(len(tasks), [(b, a) for a, b in pairs])
+
+        self.order = self._topological_order()
+        self._schedule([deadline for _, _, deadline in tasks])
+
+    def successors(self, i):
+        return self.succ_targets[self.succ_offsets[i]:self.succ_offsets[i + 1]]
+
+    def predecessors(self, i):
+        return self.pred_targets[self.pred_offsets[i]:self.pred_offsets[i + 1]]
+
+    def _topological_order(self):
+        """Kahn's algorithm; raises DependencyCycleError if some tasks are never freed"""
+        count = len(self.task_ids)
+        in_degree = array('i', (self.pred_offsets[i + 1] - self.pred_offsets[i] for i in range(count)))
+        ready = deque(i for i in range(count) if in_degree[i] == 0)
+        order = array('i')
+        while ready:
+            i = ready.popleft()
+            order.append(i)
+            for j in self.successors(i):
+                in_degree[j] -= 1
+                if in_degree[j] == 0:
+                    ready.append(j)
+        if len(order) != count:
+            cyclic = sorted(self.task_ids[i] for i in range(count) if in_degree[i] > 0)
+            raise DependencyCycleError(f'Tasks {cyclic} form a dependency cycle')
+        return order
+
+    def _schedule(self, deadlines):
+        count = len(self.task_ids)
+        earliest = array('d', [0.0]) * count
+        for i in self.order:
+            finish = earliest[i] + self.durations[i]
+            for j in self.successors(i):
+                if finish > earliest[j]:
+                    earliest[j] = finish
+
+        makespan = max((earliest[i] + self.durations[i] for i in range(count)), default=0.0)
+        latest_finish = array('d', (
+            (deadline - self.start).total_seconds() / 3600 if deadline else makespan
+            for deadline in deadlines
+        ))
+        latest = array('d', [0.0]) * count
+        for i in reversed(self.order):
+            for j in self.successors(i):
+                if latest[j] < latest_finish[i]:
+                    latest_finish[i] = latest[j]
+            latest[i] = latest_finish[i] - self.durations[i]
+
+        # The critical path is the longest chain: walk back from the task
+        # finishing last through predecessors that finish exactly when it starts
+        path = []
+        if count:
+            i = max(range(count), key=lambda k: earliest[k] + self.durations[k])
+            while i is not None:
+                path.append(self.task_ids[i])
+                i = next((p for p in self.predecessors(i)
+                          if earliest[p] + self.durations[p] == earliest[i]), None)
+            path.reverse()
+
+        self.earliest_start = earliest
+        self.latest_start = latest
+        self.critical_path = path
+
+    def reaches(self, source_id, target_id):
+        """Whether target_id can be reached from source_id by following dependents"""
+        if source_id not in self.index or target_id not in self.index:
+            return False
+        target = self.index[target_id]
+        seen = {self.index[source_id]}
+        queue = deque(seen)
+        while queue:
+            i = queue.popleft()
+            if i == target:
+                return True
+            for j in self.successors(i):
+                if j not in seen:
+                    seen.add(j)
+                    queue.append(j)
+        return False
+
+    def to_dict(self):
+        hours = lambda value: self.start + timedelta(hours=value)
+        critical = set(self.critical_path)
+        return {
+            'project_id': self.project_id,
+            'order': [self.task_ids[i] for i in self.order],
+            'critical_path': list(self.critical_path),
+            'tasks': [{
+                'id': self.task_ids[i],
+                'depends_on': [self.task_ids[p] for p in self.predecessors(i)],
+                'earliest_start': hours(self.earliest_start[i]).isoformat(),
+                'latest_start': hours(self.latest_start[i]).isoformat(),
+                'slack_hours': round(self.latest_start[i] - self.earliest_start[i], 2),
+                'critical': self.task_ids[i] in critical
+            } for i in self.order]
+        }
+
+
+def _load(project_id):
+    start = db.session.execute(select(Project.created_at).where(Project.id == project_id)).scalar()
+    if start is None:
+        return None
+    tasks = db.session.execute(
+        select(Task.id, Task.estimated_hours, Task.deadline)
+        .where(Task.project_id == project_id)
+        .order_by(Task.id)
+    ).all()
+
+    # All edges in one query; both ends must belong to the project
+    prereq = aliased(Task)
+    dependent = aliased(Task)
+    edges = db.session.execute(
+        select(TaskDependency.depends_on_id, TaskDependency.task_id)
+        .join(dependent, and_(dependent.id == TaskDependency.task_id, dependent.project_id == project_id))
+        .join(prereq, and_(prereq.id == TaskDependency.depends_on_id, prereq.project_id == project_id))
+    ).all()
+
+    return DependencyGraph(project_id, start, tasks, edges)
+
+
+def project_graph(project_id, refresh=False):
+    """
+    Cached DependencyGraph for a project, or None if the project does not exist
+
+    refresh reloads the graph even if the cached one looks current, for
+    callers that find tasks it does not know about. Raises
+    DependencyCycleError if the stored dependencies contain a cycle.
+    """
+    current = (version('project', project_id), version('dependencies', project_id))
+    entry = _graphs.get(project_id)
+    if refresh or entry is None or entry[0] != current:
+        entry = (current, _load(project_id))
+        _graphs.set(project_id, entry)
+    return entry[1]
+
+
+def add_dependency(task, depends_on):
+    """
+    Record that task depends on depends_on, rejecting edges that would form a cycle
+
+    Both tasks must belong to the same project. Raises DependencyCycleError
+    (a ValueError) or ValueError with a user-facing message.
+    """
+    if task.id == depends_on.id:
+        raise DependencyCycleError('A task cannot depend on itself')
+    if task.project_id != depends_on.project_id:
+        raise ValueError('Dependencies must be between tasks of the same project')
+
+    exists = db.session.execute(
+        select(TaskDependency.id).where(TaskDependency.task_id == task.id,
+                                        TaskDependency.depends_on_id == depends_on.id)
+    ).first()
+    if exists:
+        return
+
+    # The new edge closes a cycle if depends_on already (transitively) depends on task
+    if project_graph(task.project_id).reaches(task.id, depends_on.id):
+        raise DependencyCycleError(f'Task {depends_on.id} already depends on task {task.id}')
+
+    db.session.add(TaskDependency(task_id=task.id, depends_on_id=depends_on.id))
+    db.session.commit()
+    bump('dependencies', task.project_id)
+
+
+def remove_dependency(task, depends_on_id):
+    """Delete the dependency of task on depends_on_id, if any"""
+    TaskDependency.query.filter_by(task_id=task.id, depends_on_id=depends_on_id)\
+        .delete(synchronize_session=False)
+    db.session.commit()
+    bump('dependencies', task.project_id)
+
+
+def newly_unblocked(task_ids):
+    """
+    Dependents of just-completed tasks whose prerequisites are now all complete
+
+    Uses the depends_on_id index to find the dependents and the task_id index
+    to check their other prerequisites, so the cost grows with the number of
+    dependents rather than the size of the dependency table.
+    Returns (id, title, assignee_id) rows.
+    """
+    dependents = select(TaskDependency.task_id).where(TaskDependency.depends_on_id.in_(task_ids))
+    still_blocked = select(TaskDependency.task_id)\
+        .join(Task, Task.id == TaskDependency.depends_on_id)\
+        .where(TaskDependency.task_id.in_(dependents), Task.status != 'Completed')
+    return db.session.execute(
+        select(Task.id, Task.title, Task.assignee_id)
+        .where(Task.id.in_(dependents), Task.status != 'Completed', Task.id.not_in(still_blocked))
+        .order_by(Task.id)
+    ).all()
@@ -0,0 +1,217 @@
+"""
+Structured Logging for SupportSphere
+JSON log lines with request ids, written off the request thread
+
+Records are handed to a queue and formatted and written by a listener
+thread, so a slow stdout or log collector never stalls a request. Each
+record carries the request id, user id and endpoint of the request that
+logged it. Background work keeps that id: wrap thread targets in
+propagate(), and wrap scheduled jobs in log_context(), which gives each
+run an id of its own.
+
+Every request also gets one access line with its status, duration and
+SQL query count, and an X-Request-ID response header. An incoming
+X-Request-ID (e.g. from a load balancer) is reused.
+"""
+
+import atexit
+import contextvars
+import copy
+import json
+import logging
+import os
+import queue
+import re
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from flask import g, has_request_context, request
+
+from utils import query_audit
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+_VALID_REQUEST_ID = re.compile(r'^[A-Za-z0-9._:-]{1,64}$')
+
+# Attributes every LogRecord has; anything else was passed through `extra`
+_STANDARD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_context = contextvars.ContextVar('log_context', default=None)
+
+access_logger = logging.getLogger('supportsphere.access')
+
+
+def new_request_id():
+    return uuid.uuid4().hex
+
+
+def current_context():
+    """request_id, user_id and endpoint of the current request or background job"""
+    if has_request_context():
+        user = g.get('_login_user')
+        return {
+            'request_id': g.get('request_id'),
+            'user_id': getattr(user, 'id', None),
+            'endpoint': request.endpoint
+        }
+    return _context.get() or {}
+
+
+def propagate(target):
+    """Wrap a thread target so its log lines carry the caller's request id"""
+    context = current_context()
+
+    def run(*args, **kwargs):
+        token = _context.set(context)
+        try:
+            return target(*args, **kwargs)
+        finally:
+            _context.reset(token)
+    return run
+
+
+@contextmanager
+def log_context(**fields):
+    """Run a block of background work under a fresh request id, e.g. one scheduler run"""
+    token = _context.set({'request_id': new_request_id(), **fields})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+# ==================== FORMATTING ====================
+
+class ContextFilter(logging.Filter):
+    """Copy the request context onto each record in the thread that logs it"""
+
+    def filter(self, record):
+        for key, value in current_context().items():
+            if value is not None and not hasattr(record, key):
+                setattr(record, key, value)
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message, context and extras"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class _QueueHandler(QueueHandler):
+    """
+    QueueHandler that owns its listener thread
+
+    Threads do not survive fork, so the listener is (re)started on the first
+    record logged in each process, e.g. in every gunicorn worker.
+    """
+
+    def __init__(self, target):
+        super().__init__(queue.SimpleQueue())
+        self.target = target
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def prepare(self, record):
+        # Render message and traceback here, in the logging thread, where
+        # the arguments are still valid; the listener only serializes
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        if self._pid != os.getpid():
+            self._start()
+        self.queue.put_nowait(record)
+
+    def _start(self):
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            self.queue = queue.SimpleQueue()
+            listener = QueueListener(self.queue, self.target, respect_handler_level=True)
+            listener.start()
+            atexit.register(listener.stop)
+            self._pid = os.getpid()
+
+
+_handler = None
+_exception_formatter = logging.Formatter()
+
+
+def configure(level='INFO'):
+    """Route the root logger through the JSON queue handler (idempotent)"""
+    global _handler
+    root = logging.getLogger()
+    root.setLevel(level)
+    if _handler is not None:
+        return
+    stream = logging.StreamHandler(sys.stdout)
+    stream.setFormatter(JsonFormatter())
+    _handler = _QueueHandler(stream)
+    _handler.addFilter(ContextFilter())
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(_handler)
+
+
+# ==================== REQUEST HOOKS ====================
+
+def _before_request():
+    incoming = request.headers.get(REQUEST_ID_HEADER, '')
+    g.request_id = incoming if _VALID_REQUEST_ID.match(incoming) else new_request_id()
+    g._log_start = time.perf_counter()
+
+
+def _after_request(response):
+    response.headers[REQUEST_ID_HEADER] = g.get('request_id', '')
+    g._log_status = response.status_code
+    return response
+
+
+def _teardown_request(exc):
+    start = g.pop('_log_start', None)
+    if start is None:
+        return
+    queries, _ = query_audit.request_stats()
+    status = 500 if exc is not None else g.get('_log_status', 500)
+    # Probes and scrapes would drown everything else at INFO
+    level = logging.DEBUG if (request.endpoint or '').startswith('health.') else logging.INFO
+    access_logger.log(level, 'request', extra={
+        'method': request.method,
+        'path': request.path,
+        'status': status,
+        'duration_ms': round((time.perf_counter() - start) * 1000, 2),
+        'queries': queries
+    })
+
+
+def init_app(app):
+    """Configure JSON logging and tag every request with a request id"""
+    configure(app.config.get('LOG_LEVEL', 'INFO'))
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
@@ -0,0 +1,177 @@
+"""
+Request Profiler for SupportSphere
+On-demand stack-sampling profiles of single requests
+
+A profiled request gets a helper thread that samples the request thread's
+stack every PROFILE_INTERVAL_MS and writes the result in the folded-stack
+format (`frame;frame;frame count`) read by flamegraph.pl, speedscope and
+inferno, to instance/profiles. Template code shows up as
+`template.html:block` frames, SQL as SQLAlchemy/sqlite3 frames.
+
+A request is profiled when
+  - a logged-in manager adds ?_profile=1,
+  - it carries an X-Profile-Token header signed with the app's secret key
+    (mint one with `python -m utils.profiler`), or
+  - it is picked by PROFILE_SAMPLE_RATE (fraction of requests, default 0).
+
+Requests that are not profiled only pay a header lookup and a query
+string check.
+"""
+
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from flask import current_app, g, request
+from flask_login import current_user
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+TOKEN_HEADER = 'X-Profile-Token'
+QUERY_FLAG = b'_profile=1'
+TOKEN_SALT = 'request-profile'
+DEFAULT_INTERVAL_MS = 2
+DEFAULT_TOKEN_MAX_AGE = 3600
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+logger = logging.getLogger(__name__)
+
+_labels = {}
+
+
+def _label(frame):
+    """Flamegraph frame name for a code object, computed once per code object"""
+    code = frame.f_code
+    label = _labels.get(code)
+    if label is None:
+        template = frame.f_globals.get('__jinja_template__')
+        if template is not None:
+            label = f"{template.name or '<string>'}:{code.co_name}"
+        else:
+            filename = code.co_filename
+            if filename.startswith(ROOT) and 'site-packages' not in filename:
+                filename = os.path.relpath(filename, ROOT)
+            else:
+                filename = os.path.basename(filename)
+            # co_qualname is new in Python 3.11; 3.10 only has the bare name
+            name = getattr(code, 'co_qualname', code.co_name)
+            label = f'{name}@{filename}:{code.co_firstlineno}'
+        # Folded stacks separate frames with ';' and counts with ' '
+        label = _labels[code] = label.replace(';', ',').replace(' ', '_')
+    return label
+
+
+class Sampler(threading.Thread):
+    """Samples one thread's stack at a fixed interval until stopped"""
+
+    def __init__(self, thread_id, interval):
+        super().__init__(name='request-profiler', daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                break
+            stack = []
+            while frame is not None:
+                stack.append(_label(frame))
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+
+def make_token(app):
+    """Signed value for the X-Profile-Token header, valid for PROFILE_TOKEN_MAX_AGE seconds"""
+    return URLSafeTimedSerializer(app.secret_key, salt=TOKEN_SALT).dumps('profile')
+
+
+def _valid_token(token):
+    serializer = URLSafeTimedSerializer(current_app.secret_key, salt=TOKEN_SALT)
+    try:
+        serializer.loads(token, max_age=current_app.config['PROFILE_TOKEN_MAX_AGE'])
+    except BadSignature:
+        return False
+    return True
+
+
+def _requested():
+    token = request.headers.get(TOKEN_HEADER)
+    if token is not None:
+        return _valid_token(token)
+    if QUERY_FLAG in request.query_string:
+        return current_user.is_authenticated and current_user.role == 'manager'
+    rate = current_app.config['PROFILE_SAMPLE_RATE']
+    return rate > 0 and random.random() < rate
+
+
+def _before_request():
+    if not _requested():
+        return
+    sampler = Sampler(threading.get_ident(), current_app.config['PROFILE_INTERVAL_MS'] / 1000)
+    g._profile = (sampler, time.perf_counter())
+    sampler.start()
+
+
+def _after_request(response):
+    profile = g.get('_profile')
+    if profile is not None:
+        g._profile_name = _profile_name(profile[1])
+        response.headers['X-Profile'] = g._profile_name
+    return response
+
+
+def _profile_name(start):
+    endpoint = (request.endpoint or 'none').replace('.', '-')
+    stamp = datetime.utcnow().strftime('%Y%m%dT%H%M%S%f')
+    return f'{stamp}-{endpoint}-{(time.perf_counter() - start) * 1000:.0f}ms.folded'
+
+
+def _teardown_request(exc):
+    profile = g.pop('_profile', None)
+    if profile is None:
+        return
+    sampler, start = profile
+    sampler.stop()
+    if not sampler.samples:
+        return
+    name = g.pop('_profile_name', None) or _profile_name(start)
+    directory = current_app.config['PROFILE_DIR']
+    try:
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, name), 'w') as f:
+            for stack, count in sampler.stacks.most_common():
+                f.write(f'{stack} {count}\n')
+    except OSError:
+        logger.exception("Error writing profile", extra={'profile': name})
+        return
+    logger.info("Request profiled", extra={'profile': name, 'samples': sampler.samples})
+
+
+def init_app(app):
+    """Register the profiling hooks; profiling itself stays off until requested"""
+    app.config.setdefault('PROFILE_DIR', os.path.join(app.instance_path, 'profiles'))
+    app.config.setdefault('PROFILE_SAMPLE_RATE', 0.0)
+    app.config.setdefault('PROFILE_INTERVAL_MS', DEFAULT_INTERVAL_MS)
+    app.config.setdefault('PROFILE_TOKEN_MAX_AGE', DEFAULT_TOKEN_MAX_AGE)
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+
+
+if __name__ == '__main__':
+    from app import create_app
+    print(make_token(create_app(with_routes=False)))
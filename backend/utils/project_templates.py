@@ -0,0 +1,197 @@
+"""
+Project Templates for SupportSphere
+Saves a project's tasks, milestones and dependency graph as a reusable
+template and instantiates it with executemany inserts
+
+Deadlines are stored as offsets in seconds from the source project's
+creation time and re-applied relative to the new project's start date.
+The offsets are computed in Python, so no dialect-specific date SQL is
+needed; dependency graphs are copied by the database by task position.
+"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, insert, func, literal
+
+from extensions import db
+from models import (Project, Task, Milestone, TaskDependency, ProjectTemplate,
+                    TemplateTask, TemplateMilestone, TemplateDependency)
+
+
+def _offset_seconds(deadline, start):
+    """Whole seconds from start to a deadline"""
+    return round((deadline - start).total_seconds())
+
+
+def _task_positions(project_id):
+    """Subquery numbering a project's tasks 1..N in id order"""
+    return select(
+        Task.id,
+        func.row_number().over(order_by=Task.id).label('position')
+    ).where(Task.project_id == project_id).subquery()
+
+
+def save_template(project, name, created_by_id):
+    """
+    Copy a project's tasks, milestones and dependencies into a new template
+
+    Everything is copied in one transaction with one INSERT per table.
+    Returns the ProjectTemplate.
+    """
+    template = ProjectTemplate(
+        name=name,
+        description=project.description,
+        complexity=project.complexity,
+        duration_seconds=round((project.deadline - project.created_at).total_seconds()),
+        source_project_id=project.id,
+        created_by_id=created_by_id
+    )
+
+    try:
+        db.session.add(template)
+        db.session.flush()
+
+        tasks = db.session.execute(
+            select(Task.title, Task.description, Task.role, Task.priority, Task.estimated_hours, Task.deadline)
+            .where(Task.project_id == project.id)
+            .order_by(Task.id)
+        ).all()
+        if tasks:
+            db.session.execute(insert(TemplateTask), [{
+                'template_id': template.id,
+                'position': position,
+                'title': title,
+                'description': description,
+                'role': role,
+                'priority': priority,
+                'estimated_hours': estimated_hours,
+                'offset_seconds': _offset_seconds(deadline, project.created_at)
+            } for position, (title, description, role, priority, estimated_hours, deadline) in enumerate(tasks, 1)])
+
+        milestones = db.session.execute(
+            select(Milestone.title, Milestone.description, Milestone.deadline)
+            .where(Milestone.project_id == project.id)
+        ).all()
+        if milestones:
+            db.session.execute(insert(TemplateMilestone), [{
+                'template_id': template.id,
+                'title': title,
+                'description': description,
+                'offset_seconds': _offset_seconds(deadline, project.created_at)
+            } for title, description, deadline in milestones])
+
+        # Dependencies are stored by task position so they survive the copy
+        positions = _task_positions(project.id)
+        task, depends_on = positions.alias(), positions.alias()
+        db.session.execute(insert(TemplateDependency).from_select(
+            ['template_id', 'task_position', 'depends_on_position'],
+            select(literal(template.id), task.c.position, depends_on.c.position)
+            .select_from(TaskDependency)
+            .join(task, task.c.id == TaskDependency.task_id)
+            .join(depends_on, depends_on.c.id == TaskDependency.depends_on_id)
+        ))
+
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return template
+
+
+def instantiate_template(template, title, customer_id, manager_id, start=None):
+    """
+    Create a new project from a template with deadlines shifted to start
+
+    Tasks are inserted in position order with one executemany INSERT, so
+    the n-th new task id belongs to template position n; dependencies are
+    then rebuilt by matching positions. Returns the new Project.
+    """
+    start = start or datetime.utcnow()
+    now = datetime.utcnow()
+
+    project = Project(
+        title=title,
+        description=template.description,
+        complexity=template.complexity,
+        deadline=start + timedelta(seconds=template.duration_seconds or 0),
+        customer_id=customer_id,
+        manager_id=manager_id,
+        status='Pending'
+    )
+
+    try:
+        db.session.add(project)
+        db.session.flush()
+
+        tasks = db.session.execute(
+            select(TemplateTask.title, TemplateTask.description, TemplateTask.role,
+                   TemplateTask.priority, TemplateTask.estimated_hours, TemplateTask.offset_seconds)
+            .where(TemplateTask.template_id == template.id)
+            .order_by(TemplateTask.position)
+        ).all()
+        if tasks:
+            db.session.execute(insert(Task), [{
+                'title': title,
+                'description': description,
+                'role': role,
+                'priority': priority,
+                'status': 'Pending',
+                'progress': 0,
+                'estimated_hours': estimated_hours,
+                'created_at': now,
+                'deadline': start + timedelta(seconds=offset),
+                'project_id': project.id,
+                'created_by_id': manager_id
+            } for title, description, role, priority, estimated_hours, offset in tasks])
+
+        milestones = db.session.execute(
+            select(TemplateMilestone.title, TemplateMilestone.description, TemplateMilestone.offset_seconds)
+            .where(TemplateMilestone.template_id == template.id)
+        ).all()
+        if milestones:
+            db.session.execute(insert(Milestone), [{
+                'title': title,
+                'description': description,
+                'progress': 0,
+                'deadline': start + timedelta(seconds=offset),
+                'project_id': project.id
+            } for title, description, offset in milestones])
+
+        positions = _task_positions(project.id)
+        task, depends_on = positions.alias(), positions.alias()
+        db.session.execute(insert(TaskDependency).from_select(
+            ['task_id', 'depends_on_id'],
+            select(task.c.id, depends_on.c.id)
+            .select_from(TemplateDependency)
+            .join(task, task.c.position == TemplateDependency.task_position)
+            .join(depends_on, depends_on.c.position == TemplateDependency.depends_on_position)
+            .where(TemplateDependency.template_id == template.id)
+        ))
+
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return project
+
+
+def template_summaries():
+    """List templates with their task counts, newest first"""
+    task_count = select(func.count(TemplateTask.id))\
+        .where(TemplateTask.template_id == ProjectTemplate.id)\
+        .scalar_subquery()
+    rows = db.session.execute(
+        select(ProjectTemplate.id, ProjectTemplate.name, ProjectTemplate.complexity,
+               ProjectTemplate.duration_seconds, ProjectTemplate.created_at, task_count)
+        .order_by(ProjectTemplate.created_at.desc())
+    )
+    return [{
+        'id': row[0],
+        'name': row[1],
+        'complexity': row[2],
+        'duration_days': round((row[3] or 0) / 86400),
+        'created_at': row[4].isoformat() if row[4] else None,
+        'tasks': row[5]
+    } for row in rows]
@@ -0,0 +1,214 @@
+"""
+Read-only Projections for SupportSphere
+Column-limited queries into slotted rows for list and dashboard rendering
+"""
+
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import NamedTuple
+
+from sqlalchemy import select, func, and_
+from sqlalchemy.orm import aliased
+
+from extensions import db
+from models import User, Project, Task, TeamMember, TaskNote
+
+# Long text columns are cut to this many characters on list queries. Anything
+# above the 100 (+5 leeway) characters `truncate` keeps renders identically,
+# so only detail views need to read the full column.
+PREVIEW_LENGTH = 120
+
+
+class UserRef(NamedTuple):
+    """Minimal user row for pickers and avatar lists"""
+    id: int
+    name: str
+    email: str
+
+
+class NoteRow(NamedTuple):
+    """Task note as shown in dashboard previews and the notes API"""
+    id: int
+    content: str
+    timestamp: datetime
+    author_name: str
+
+
+@dataclass(slots=True, frozen=True)
+class ProjectCard:
+    """Read-only project row used by dashboard cards and tables"""
+    id: int
+    title: str
+    status: str
+    progress: int
+    complexity: str
+    deadline: datetime
+    created_at: datetime
+    manager_name: str = None
+    description: str = None  # preview, see PREVIEW_LENGTH
+    member_names: tuple = ()
+
+    @property
+    def days_remaining(self):
+        if self.deadline:
+            delta = self.deadline - datetime.utcnow()
+            return max(0, delta.days)
+        return 0
+
+
+@dataclass(slots=True, frozen=True)
+class TaskRow:
+    """Read-only task row used by the team dashboard"""
+    id: int
+    title: str
+    description: str  # preview, see PREVIEW_LENGTH
+    role: str
+    priority: str
+    status: str
+    progress: int
+    deadline: datetime
+    project_id: int
+    project_title: str
+    latest_note: NoteRow = None
+
+    @property
+    def is_overdue(self):
+        if self.deadline and self.status != 'Completed':
+            return datetime.utcnow() > self.deadline
+        return False
+
+
+def user_refs(role):
+    """Active users with the given role as (id, name, email) tuples"""
+    stmt = select(User.id, User.name, User.email)\
+        .where(User.role == role, User.is_active.is_(True))\
+        .order_by(User.id)
+    return [UserRef(*row) for row in db.session.execute(stmt)]
+
+
+def project_status_counts(*criteria):
+    """Map project status -> number of matching projects (one GROUP BY query)"""
+    stmt = select(Project.status, func.count(Project.id)).where(*criteria).group_by(Project.status)
+    return dict(db.session.execute(stmt).all())
+
+
+def project_cards(*criteria, order_by=None, with_manager=False,
+                  with_members=False, with_preview=False):
+    """
+    Load project cards matching the given criteria
+
+    Args:
+        criteria: SQLAlchemy filter expressions on Project
+        order_by: Optional ordering expression
+        with_manager: Include the manager's name (one outer join)
+        with_members: Include team member names (one extra query)
+        with_preview: Include the first PREVIEW_LENGTH characters of the description
+    """
+    columns = [
+        Project.id, Project.title, Project.status, Project.progress,
+        Project.complexity, Project.deadline, Project.created_at
+    ]
+    manager = aliased(User)
+    if with_manager:
+        columns.append(manager.name)
+    if with_preview:
+        columns.append(_preview(Project.description))
+
+    stmt = select(*columns).where(*criteria)
+    if with_manager:
+        stmt = stmt.outerjoin(manager, Project.manager_id == manager.id)
+    if order_by is not None:
+        stmt = stmt.order_by(order_by)
+
+    members = _member_names(criteria) if with_members else {}
+
+    cards = []
+    for row in db.session.execute(stmt):
+        extra = {}
+        position = 7
+        if with_manager:
+            extra['manager_name'] = row[position]
+            position += 1
+        if with_preview:
+            extra['description'] = row[position]
+        cards.append(ProjectCard(*row[:7], member_names=members.get(row[0], ()), **extra))
+    return cards
+
+
+def task_rows(*criteria, order_by=None, with_latest_note=False):
+    """
+    Load task rows (joined with their project title) matching the criteria
+
+    With with_latest_note, each task's newest note is outer-joined through a
+    correlated MAX(id) subquery, so the whole list is still one query no
+    matter how many notes a task carries.
+    """
+    columns = [
+        Task.id, Task.title, _preview(Task.description), Task.role, Task.priority,
+        Task.status, Task.progress, Task.deadline, Task.project_id, Project.title
+    ]
+    note = aliased(TaskNote)
+    author = aliased(User)
+    if with_latest_note:
+        columns += [note.id, note.content, note.timestamp, author.name]
+
+    stmt = select(*columns).join(Project, Task.project_id == Project.id).where(*criteria)
+    if with_latest_note:
+        latest_id = select(func.max(TaskNote.id))\
+            .where(TaskNote.task_id == Task.id)\
+            .correlate(Task)\
+            .scalar_subquery()
+        stmt = stmt.outerjoin(note, and_(note.task_id == Task.id, note.id == latest_id))\
+                   .outerjoin(author, note.author_id == author.id)
+    if order_by is not None:
+        stmt = stmt.order_by(order_by)
+
+    rows = []
+    for row in db.session.execute(stmt):
+        latest_note = None
+        if with_latest_note and row[10] is not None:
+            latest_note = NoteRow(*row[10:14])
+        rows.append(TaskRow(*row[:10], latest_note=latest_note))
+    return rows
+
+
+def task_notes_page(task_id, before=0, limit=20):
+    """
+    One page of a task's notes, newest first
+
+    Pages are keyed on note id: pass the smallest id of the previous page as
+    `before` to continue. Returns (notes, next_before) where next_before is
+    None on the last page.
+    """
+    stmt = select(TaskNote.id, TaskNote.content, TaskNote.timestamp, User.name)\
+        .outerjoin(User, TaskNote.author_id == User.id)\
+        .where(TaskNote.task_id == task_id)
+    if before > 0:
+        stmt = stmt.where(TaskNote.id < before)
+    stmt = stmt.order_by(TaskNote.id.desc()).limit(limit + 1)
+
+    notes = [NoteRow(*row) for row in db.session.execute(stmt)]
+    if len(notes) > limit:
+        notes = notes[:limit]
+        return notes, notes[-1].id
+    return notes, None
+
+
+def _preview(column):
+    """Leading slice of a text column, computed by the database"""
+    return func.substr(column, 1, PREVIEW_LENGTH)
+
+
+def _member_names(criteria):
+    """Map project id -> tuple of team member names for matching projects"""
+    stmt = select(TeamMember.project_id, User.name)\
+        .join(User, TeamMember.user_id == User.id)\
+        .where(TeamMember.project_id.in_(select(Project.id).where(*criteria)))\
+        .order_by(TeamMember.id)
+
+    names = defaultdict(list)
+    for project_id, name in db.session.execute(stmt):
+        names[project_id].append(name)
+    return {project_id: tuple(values) for project_id, values in names.items()}
+
@@ -0,0 +1,223 @@
+"""
+SQL Query Audit for SupportSphere
+Counts the statements each request runs and flags likely N+1 patterns
+
+Statements are grouped by shape: literals and placeholder lists are
+normalized away, so `SELECT ... WHERE users.id = ?` run once per row of a
+list shows up as one shape executed many times. Shapes repeated at least
+SQL_AUDIT_THRESHOLD times are reported with the template line (or Python
+line) that triggered them, which usually points straight at a lazy
+relationship such as `task.notes` inside a loop.
+
+Modes (SQL_AUDIT): 'off' (default), 'on' adds X-SQL-* response headers and
+logs suspects, 'strict' also raises NPlusOneError, for use in tests.
+
+This module owns the only engine hooks that time SQL. Every request gets a
+statement count and SQL time whatever the mode (read them with
+request_stats(); metrics and the access log do). Other per-statement
+instrumentation, such as tracing spans, registers with add_listener().
+"""
+
+import logging
+import os
+import re
+import sys
+import time
+from collections import Counter
+from functools import lru_cache
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+MODES = ('off', 'on', 'strict')
+DEFAULT_THRESHOLD = 5
+
+# Stack walks are only paid for repeated shapes, and only this many times each
+MAX_SITES = 20
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LISTS = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_SPACE = re.compile(r'\s+')
+
+
+logger = logging.getLogger(__name__)
+
+
+class NPlusOneError(RuntimeError):
+    """Raised in strict mode when a request repeats a statement shape too often"""
+
+
+@lru_cache(maxsize=2048)
+def normalize(statement):
+    """Statement shape: literals become ?, placeholder lists become (?)"""
+    shape = _LITERALS.sub('?', statement)
+    shape = _PLACEHOLDER_LISTS.sub('(?)', shape)
+    return _SPACE.sub(' ', shape).strip()
+
+
+def _call_site():
+    """Innermost template line or application line on the current stack"""
+    frame = sys._getframe(2)
+    while frame is not None:
+        template = frame.f_globals.get('__jinja_template__')
+        if template is not None:
+            return f"{template.name or '<string>'}:{template.get_corresponding_lineno(frame.f_lineno)}"
+        filename = frame.f_code.co_filename
+        if filename.startswith(ROOT) and 'site-packages' not in filename and filename != __file__:
+            return f'{os.path.relpath(filename, ROOT)}:{frame.f_lineno}'
+        frame = frame.f_back
+    return 'unknown'
+
+
+class QueryReport:
+    """Statements run during one request; grouped by shape when detailed"""
+    __slots__ = ('count', 'seconds', 'shapes')
+
+    def __init__(self, detailed=True):
+        self.count = 0
+        self.seconds = 0.0
+        # shape -> [executions, seconds, Counter of call sites of repeats]
+        self.shapes = {} if detailed else None
+
+    def record(self, statement, seconds):
+        self.count += 1
+        self.seconds += seconds
+        if self.shapes is None:
+            return
+        entry = self.shapes.get(statement)
+        if entry is None:
+            self.shapes[statement] = [1, seconds, None]
+            return
+        entry[0] += 1
+        entry[1] += seconds
+        if entry[2] is None:
+            entry[2] = Counter()
+        if entry[0] <= MAX_SITES:
+            entry[2][_call_site()] += 1
+
+    def suspects(self, threshold):
+        """(executions, seconds, shape, most common site) of shapes run at least threshold times"""
+        found = []
+        by_shape = {}
+        for statement, (executions, seconds, sites) in self.shapes.items():
+            shape = normalize(statement)
+            merged = by_shape.setdefault(shape, [0, 0.0, Counter()])
+            merged[0] += executions
+            merged[1] += seconds
+            if sites:
+                merged[2].update(sites)
+        for shape, (executions, seconds, sites) in by_shape.items():
+            if executions >= threshold:
+                site = sites.most_common(1)[0][0] if sites else 'unknown'
+                found.append((executions, seconds, shape, site))
+        return sorted(found, reverse=True)
+
+
+_listeners = []
+
+
+def add_listener(listener):
+    """
+    Call listener(conn, statement, start_ns, end_ns, rowcount, error) after every statement
+
+    Times are wall-clock nanoseconds. error is the exception of a failed
+    statement (rowcount is then None), else None.
+    """
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def request_stats():
+    """(statements, seconds in SQL) of the current request so far"""
+    report = g.get('_query_report') if has_request_context() else None
+    return (report.count, report.seconds) if report is not None else (0, 0.0)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info['_audit_start'] = time.perf_counter_ns()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = conn.info.pop('_audit_start', None)
+    if start is None:
+        return
+    elapsed = time.perf_counter_ns() - start
+    if has_request_context():
+        report = g.get('_query_report')
+        if report is not None:
+            report.record(statement, elapsed / 1e9)
+    if _listeners:
+        end = time.time_ns()
+        rowcount = cursor.rowcount if cursor.rowcount >= 0 else None
+        for listener in _listeners:
+            listener(conn, statement, end - elapsed, end, rowcount, None)
+
+
+def _handle_error(context):
+    conn = context.connection
+    start = conn.info.pop('_audit_start', None) if conn is not None else None
+    if start is None or not _listeners:
+        return
+    end = time.time_ns()
+    for listener in _listeners:
+        listener(conn, context.statement or '', end - (time.perf_counter_ns() - start), end,
+                 None, context.original_exception)
+
+
+def _make_before_request(detailed):
+    def before_request():
+        g._query_report = QueryReport(detailed)
+    return before_request
+
+
+def _make_after_request(mode, threshold):
+    def after_request(response):
+        report = g.get('_query_report')
+        if report is None:
+            return response
+        suspects = report.suspects(threshold)
+        response.headers['X-SQL-Queries'] = str(report.count)
+        response.headers['X-SQL-Time-Ms'] = f'{report.seconds * 1000:.1f}'
+        if not suspects:
+            return response
+
+        response.headers['X-SQL-N-Plus-One'] = '; '.join(
+            f'{executions}x {site}' for executions, _, _, site in suspects[:5])
+        lines = [f"Likely N+1 in {request.method} {request.path}: {report.count} queries"]
+        for executions, seconds, shape, site in suspects:
+            lines.append(f"  {executions}x ({seconds * 1000:.1f} ms) at {site}: {shape[:200]}")
+        logger.warning(lines[0], extra={'suspects': [
+            {'executions': executions, 'ms': round(seconds * 1000, 1), 'site': site, 'statement': shape[:200]}
+            for executions, seconds, shape, site in suspects]})
+        if mode == 'strict':
+            raise NPlusOneError('\n'.join(lines))
+        return response
+    return after_request
+
+
+def install():
+    """Attach the SQL timing hooks to every engine (idempotent)"""
+    if not event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(Engine, 'handle_error', _handle_error)
+
+
+def init_app(app):
+    """
+    Count every request's SQL, and audit it according to the SQL_AUDIT setting
+
+    Register before other request hooks, so the count covers everything
+    they run.
+    """
+    mode = app.config.get('SQL_AUDIT', 'off')
+    if mode not in MODES:
+        raise ValueError(f"SQL_AUDIT must be one of {', '.join(MODES)}, not {mode!r}")
+    install()
+    app.before_request(_make_before_request(detailed=mode != 'off'))
+    if mode != 'off':
+        threshold = int(app.config.get('SQL_AUDIT_THRESHOLD', DEFAULT_THRESHOLD))
+        app.after_request(_make_after_request(mode, threshold))
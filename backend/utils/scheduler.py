@@ -5,8 +5,18 @@ Handles periodic tasks like deadline reminders
 
 from datetime import datetime, timedelta
 from threading import Thread
+import logging
 import time
 
+from utils.log import log_context
+from utils.metrics import SCHEDULER_RUN_TIME
+
+logger = logging.getLogger(__name__)
+
+# Set by the running scheduler loop; read by the readiness probe
+last_heartbeat = None
+heartbeat_interval = None
+
 
 def check_deadline_reminders(app, db, mail, Task):
     """
@@ -38,14 +48,14 @@ def check_deadline_reminders(app, db, mail, Task):
                             try:
                                 send_deadline_reminder_email(mail, app, task, task.assignee)
                                 reminder_count += 1
-                            except Exception as e:
-                                print(f"Error sending deadline reminder for task {task.id}: {str(e)}")
+                            except Exception:
+                                logger.exception("Error sending deadline reminder", extra={'task_id': task.id})
             
             if reminder_count > 0:
-                print(f"Sent {reminder_count} deadline reminder(s)")
+                logger.info("Sent deadline reminders", extra={'count': reminder_count})
                 
-        except Exception as e:
-            print(f"Error in deadline reminder check: {str(e)}")
+        except Exception:
+            logger.exception("Error in deadline reminder check")
 
 
 def run_scheduler(app, db, mail, Task, interval_hours=6):
@@ -60,13 +70,21 @@ def run_scheduler(app, db, mail, Task, interval_hours=6):
         Task: Task model class
         interval_hours: Hours between checks (default: 6)
     """
+    global heartbeat_interval
+    heartbeat_interval = interval_hours * 3600
+    
     def scheduler_loop():
-        print(f"Deadline reminder scheduler started (checking every {interval_hours} hours)")
+        global last_heartbeat
+        logger.info("Deadline reminder scheduler started", extra={'interval_hours': interval_hours})
         while True:
-            try:
-                check_deadline_reminders(app, db, mail, Task)
-            except Exception as e:
-                print(f"Scheduler error: {str(e)}")
+            last_heartbeat = time.time()
+            start = time.perf_counter()
+            with log_context(job='deadline_reminders'):
+                try:
+                    check_deadline_reminders(app, db, mail, Task)
+                except Exception:
+                    logger.exception("Scheduler error")
+            SCHEDULER_RUN_TIME.observe(time.perf_counter() - start, job='deadline_reminders')
             
             # Wait for next check
             time.sleep(interval_hours * 3600)
@@ -78,6 +96,13 @@ def run_scheduler(app, db, mail, Task, interval_hours=6):
     return scheduler_thread
 
 
+def heartbeat_age():
+    """Seconds since the scheduler loop last ran, or None if it was never started"""
+    if last_heartbeat is None:
+        return None
+    return time.time() - last_heartbeat
+
+
 def check_overdue_tasks(app, db, Task):
     """
     Check for overdue tasks and update their status
@@ -97,10 +122,10 @@ def check_overdue_tasks(app, db, Task):
             for task in overdue_tasks:
                 # You could add a 'Overdue' status or just flag them
                 # For now, we'll just log them
-                print(f"Task {task.id} '{task.title}' is overdue")
+                logger.info("Task is overdue", extra={'task_id': task.id, 'title': task.title})
             
             return len(overdue_tasks)
             
-        except Exception as e:
-            print(f"Error checking overdue tasks: {str(e)}")
+        except Exception:
+            logger.exception("Error checking overdue tasks")
             return 0
@@ -0,0 +1,262 @@
+"""
+Synthetic Data Generator for SupportSphere
+Reproducible, realistic datasets for scale and performance testing
+
+One unit of scale is about a million rows: 2,000 users, 5,000 projects
+with 3-8 team members and 10-30 tasks each (dependencies, notes and
+milestones included) and roughly 650,000 chat messages. The same seed and
+scale always produce the same rows.
+
+Rows get explicit primary keys, so relationships need no read-backs, and
+are written with executemany every PROJECT_BATCH projects, which bounds
+memory at any scale. Everything runs in a single transaction; on SQLite
+the connection also skips fsyncs while loading.
+"""
+
+import random
+from datetime import datetime, timedelta
+
+from werkzeug.security import generate_password_hash
+
+from extensions import db
+from models import (User, NotificationSettings, Project, TeamMember, Milestone, Task,
+                    TaskDependency, TaskNote, ChatMessage)
+from utils.task_import import PRIORITIES
+
+PASSWORD = 'synthetic123'
+EMAIL_DOMAIN = 'synthetic.local'
+CHUNK_SIZE = 20000
+PROJECT_BATCH = 500
+
+# Per unit of scale
+MANAGERS = 50
+TEAM_MEMBERS = 1500
+CUSTOMERS = 450
+PROJECTS = 5000
+
+TEAM_SIZE = (3, 8)
+TASKS_PER_PROJECT = (10, 30)
+MILESTONES_PER_PROJECT = (2, 4)
+MAX_DEPENDENCIES = 2
+MAX_NOTES = 2
+MESSAGES_PER_PROJECT = (20, 240)
+
+ROLES = ['Developer', 'Designer', 'QA Engineer', 'DevOps', 'Analyst', 'Technical Writer']
+COMPLEXITIES = ['Low', 'Medium', 'High']
+BUDGETS = ['< $5k', '$5k - $20k', '$20k - $50k', '> $50k']
+FIRST_NAMES = ['Alex', 'Sam', 'Jordan', 'Taylor', 'Morgan', 'Casey', 'Riley', 'Jamie', 'Avery', 'Quinn',
+               'Drew', 'Parker', 'Reese', 'Rowan', 'Sky', 'Emerson', 'Hayden', 'Kai', 'Logan', 'Noa']
+LAST_NAMES = ['Smith', 'Garcia', 'Chen', 'Patel', 'Okafor', 'Novak', 'Silva', 'Kim', 'Müller', 'Haddad',
+              'Johansson', 'Rossi', 'Nguyen', 'Kowalski', 'Dubois', 'Tanaka', 'Reyes', 'Ivanova', 'Cohen', 'Brown']
+PRODUCTS = ['Portal', 'Mobile App', 'Data Pipeline', 'CRM Integration', 'Analytics Dashboard', 'Checkout',
+            'Support Desk', 'Inventory System', 'Booking Engine', 'Reporting Suite']
+VERBS = ['Implement', 'Design', 'Test', 'Refactor', 'Document', 'Deploy', 'Review', 'Optimize', 'Fix', 'Migrate']
+SUBJECTS = ['login flow', 'payment API', 'search index', 'user settings', 'email templates', 'audit log',
+            'export job', 'admin panel', 'caching layer', 'onboarding wizard', 'notifications', 'database schema']
+PHRASES = ['Can we get an update on this?', 'Deployed to staging, please take a look.',
+           'The latest build fixes the issue we discussed.', 'I have a question about the requirements.',
+           'Moving the deadline by two days.', 'Looks good to me!', 'Blocked on the API credentials.',
+           'Meeting notes are attached to the task.', 'Thanks, that works for us.',
+           'Could you clarify the acceptance criteria?', 'QA found two regressions, fixing now.',
+           'Budget approved for the next phase.']
+
+
+def _between(rng, start, end):
+    return start + timedelta(seconds=rng.random() * max((end - start).total_seconds(), 0))
+
+
+def _insert(conn, model, rows, counts):
+    table = model.__table__
+    for offset in range(0, len(rows), CHUNK_SIZE):
+        conn.execute(table.insert(), rows[offset:offset + CHUNK_SIZE])
+    counts[table.name] = counts.get(table.name, 0) + len(rows)
+    del rows[:]
+
+
+def generate(scale=1.0, seed=42, now=None, progress=None):
+    """
+    Fill an empty database with a synthetic dataset
+
+    Args:
+        scale: Size multiplier; 1.0 is about a million rows
+        seed: Random seed; the same seed and scale give the same data
+        now: Reference time for dates (defaults to the current time)
+        progress: Optional callable receiving the number of rows written so far
+
+    Returns a dict of row counts per table. Raises ValueError if the
+    database already contains users.
+    """
+    if db.session.query(User.id).first() is not None:
+        raise ValueError('Database is not empty; generate into a fresh database')
+
+    rng = random.Random(seed)
+    now = now or datetime.utcnow().replace(microsecond=0)
+    counts = {}
+    conn = db.session.connection()
+    if conn.dialect.name == 'sqlite':
+        conn.exec_driver_sql('PRAGMA synchronous = OFF')
+
+    def write(*batches):
+        for model, rows in batches:
+            _insert(conn, model, rows, counts)
+        if progress:
+            progress(sum(counts.values()))
+
+    # ---- users ----
+    password_hash = generate_password_hash(PASSWORD)
+    n_managers = max(1, round(MANAGERS * scale))
+    n_members = max(3, round(TEAM_MEMBERS * scale))
+    n_customers = max(1, round(CUSTOMERS * scale))
+    users = []
+    for role, count in (('manager', n_managers), ('team_member', n_members), ('customer', n_customers)):
+        for i in range(count):
+            users.append({
+                'id': len(users) + 1,
+                'name': f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+                'email': f'{role}{i + 1}@{EMAIL_DOMAIN}',
+                'password_hash': password_hash,
+                'role': role,
+                'created_at': now - timedelta(days=rng.randint(30, 1000)),
+                'is_active': rng.random() > 0.02
+            })
+    managers = range(1, n_managers + 1)
+    members = range(n_managers + 1, n_managers + n_members + 1)
+    customers = range(n_managers + n_members + 1, len(users) + 1)
+    settings = [{
+        'id': user['id'],
+        'user_id': user['id'],
+        'email_new_message': rng.random() < 0.3,
+        'digest_frequency': rng.choice(['immediate', 'immediate', 'daily', 'weekly'])
+    } for user in users]
+    write((User, users), (NotificationSettings, settings))
+
+    # ---- projects and everything that hangs off them ----
+    projects, team_rows, milestones = [], [], []
+    tasks, dependencies, notes, messages = [], [], [], []
+    batches = ((Project, projects), (TeamMember, team_rows), (Milestone, milestones), (Task, tasks),
+               (TaskDependency, dependencies), (TaskNote, notes), (ChatMessage, messages))
+    ids = dict.fromkeys(('team', 'milestone', 'task', 'dependency', 'note', 'message'), 0)
+
+    def next_id(kind):
+        ids[kind] += 1
+        return ids[kind]
+
+    n_projects = max(1, round(PROJECTS * scale))
+    for project_id in range(1, n_projects + 1):
+        created = now - timedelta(days=rng.uniform(1, 540))
+        deadline = created + timedelta(days=rng.uniform(14, 240))
+        status = 'Completed' if deadline < now and rng.random() < 0.85 else \
+            rng.choice(['Pending', 'In Progress', 'In Progress', 'In Progress', 'On Hold'])
+        customer_id = rng.choice(customers)
+        manager_id = rng.choice(managers)
+        team = rng.sample(members, rng.randint(*TEAM_SIZE))
+
+        for user_id in team:
+            team_rows.append({
+                'id': next_id('team'),
+                'project_id': project_id,
+                'user_id': user_id,
+                'role': rng.choice(ROLES),
+                'assigned_at': _between(rng, created, min(deadline, now)),
+                'is_active': rng.random() > 0.05
+            })
+
+        for m in range(rng.randint(*MILESTONES_PER_PROJECT)):
+            milestone_deadline = _between(rng, created, deadline)
+            milestones.append({
+                'id': next_id('milestone'),
+                'title': f'Milestone {m + 1}',
+                'description': rng.choice(PHRASES),
+                'progress': 100 if status == 'Completed' or milestone_deadline < now and rng.random() < 0.7
+                else rng.randint(0, 90),
+                'deadline': milestone_deadline,
+                'project_id': project_id
+            })
+
+        first_task = ids['task'] + 1
+        done = 0
+        n_tasks = rng.randint(*TASKS_PER_PROJECT)
+        for t in range(n_tasks):
+            task_id = next_id('task')
+            task_deadline = _between(rng, created, deadline)
+            if status == 'Completed' or (task_deadline < now and rng.random() < 0.8):
+                task_status, progress_value = 'Completed', 100
+            else:
+                task_status = rng.choice(['Pending', 'In Progress', 'In Progress'])
+                progress_value = 0 if task_status == 'Pending' else rng.randint(5, 95)
+            done += task_status == 'Completed'
+            task_created = _between(rng, created, min(task_deadline, now))
+            assignee = rng.choice(team) if rng.random() < 0.9 else None
+            tasks.append({
+                'id': task_id,
+                'title': f'{rng.choice(VERBS)} {rng.choice(SUBJECTS)}',
+                'description': rng.choice(PHRASES),
+                'role': rng.choice(ROLES),
+                'priority': rng.choice(PRIORITIES),
+                'status': task_status,
+                'progress': progress_value,
+                'estimated_hours': rng.choice([2, 4, 8, 8, 16, 24, 40]),
+                'created_at': task_created,
+                'deadline': task_deadline,
+                'completed_at': _between(rng, task_created, min(task_deadline, now))
+                if task_status == 'Completed' else None,
+                'project_id': project_id,
+                'assignee_id': assignee,
+                'created_by_id': manager_id
+            })
+
+            # Dependencies only point at earlier tasks of the project, so the graph is acyclic
+            if t:
+                for depends_on in set(rng.randint(first_task, task_id - 1)
+                                      for _ in range(rng.randint(0, MAX_DEPENDENCIES))):
+                    dependencies.append({'id': next_id('dependency'), 'task_id': task_id,
+                                         'depends_on_id': depends_on})
+
+            for _ in range(rng.randint(0, MAX_NOTES)):
+                notes.append({
+                    'id': next_id('note'),
+                    'content': rng.choice(PHRASES),
+                    'timestamp': _between(rng, task_created, now),
+                    'task_id': task_id,
+                    'author_id': assignee or manager_id
+                })
+
+        projects.append({
+            'id': project_id,
+            'title': f'{rng.choice(PRODUCTS)} #{project_id}',
+            'description': ' '.join(rng.choice(PHRASES) for _ in range(rng.randint(3, 12))),
+            'complexity': rng.choice(COMPLEXITIES),
+            'status': status,
+            'progress': 100 if status == 'Completed' else round(100 * done / n_tasks),
+            'budget_range': rng.choice(BUDGETS),
+            'nda_required': rng.random() < 0.2,
+            'created_at': created,
+            'deadline': deadline,
+            'completed_at': min(deadline, now) if status == 'Completed' else None,
+            'customer_id': customer_id,
+            'manager_id': manager_id
+        })
+
+        # Chat is busiest around the middle of a project
+        senders = [customer_id, manager_id] + team
+        last = min(now, deadline + timedelta(days=14))
+        for _ in range(rng.randint(*MESSAGES_PER_PROJECT)):
+            sent = created + (last - created) * rng.triangular(0, 1, 0.5)
+            messages.append({
+                'id': next_id('message'),
+                'message': rng.choice(PHRASES),
+                'timestamp': sent,
+                'is_read': (now - sent).days > 2 or rng.random() < 0.5,
+                'project_id': project_id,
+                'sender_id': rng.choice(senders)
+            })
+
+        if project_id % PROJECT_BATCH == 0 or project_id == n_projects:
+            write(*batches)
+
+    db.session.commit()
+    if conn.dialect.name == 'sqlite':
+        # Fresh statistics, so the query planner sees the real distribution
+        with db.engine.connect() as fresh:
+            fresh.exec_driver_sql('ANALYZE')
+    return counts
@@ -0,0 +1,273 @@
+"""
+Bulk Task Import for SupportSphere
+Streams CSV / JSON task uploads, validates rows incrementally and inserts
+them in executemany batches
+"""
+
+import codecs
+import csv
+import json
+import re
+from datetime import datetime
+
+from sqlalchemy import select, insert
+
+from extensions import db
+from models import Task, User
+from utils.assignment import AUTO, AutoAssigner
+
+BATCH_SIZE = 2000
+CHUNK_SIZE = 64 * 1024
+MAX_REPORTED_ERRORS = 100
+MAX_TITLES_PER_ASSIGNEE = 10
+
+PRIORITIES = ('Low', 'Medium', 'High', 'Urgent')
+
+# Whitespace and the commas between array elements
+_SEPARATORS = re.compile(r'[\s,]*')
+
+# A number or true/false/null cut off at the end of a chunk fails to decode
+# within this many characters of the end
+_MAX_TOKEN = 64
+
+
+class MalformedRow:
+    """Placeholder yielded for a JSON row that could not be decoded"""
+
+    def __init__(self, message):
+        self.message = message
+
+
+class ImportSummary:
+    """Counters and per-assignee notification digests for one import"""
+
+    def __init__(self):
+        self.imported = 0
+        self.skipped = 0
+        self.errors = []
+        self.assignments = {}  # assignee id -> (count, first titles)
+
+    def add_error(self, line, message):
+        self.skipped += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'row': line, 'error': message})
+
+    def add_assignment(self, assignee_id, title):
+        count, titles = self.assignments.get(assignee_id, (0, []))
+        if len(titles) < MAX_TITLES_PER_ASSIGNEE:
+            titles.append(title)
+        self.assignments[assignee_id] = (count + 1, titles)
+
+    def to_dict(self):
+        return {
+            'imported': self.imported,
+            'skipped': self.skipped,
+            'errors': self.errors
+        }
+
+
+def detect_format(filename=None, mimetype=None, requested=None):
+    """Pick 'csv' or 'json' from an explicit choice, the file name or the mimetype"""
+    if requested in ('csv', 'json'):
+        return requested
+    name = (filename or '').lower()
+    if name.endswith('.csv'):
+        return 'csv'
+    if name.endswith(('.json', '.jsonl', '.ndjson')):
+        return 'json'
+    if mimetype and 'json' in mimetype:
+        return 'json'
+    return 'csv'
+
+
+def iter_rows(stream, fmt):
+    """Yield (line number, row dict) pairs from a binary stream without buffering the whole file"""
+    reader = codecs.getreader('utf-8-sig')(stream)
+    if fmt == 'json':
+        return _iter_json(reader)
+    return _iter_csv(reader)
+
+
+def _iter_csv(reader):
+    rows = csv.DictReader(reader)
+    for row in rows:
+        yield rows.line_num, row
+
+
+def _iter_json(reader):
+    """
+    Parse a top-level JSON array, or JSON Lines, one value at a time
+
+    The buffer only ever holds the unread tail of the current chunk plus
+    the value being decoded. A row that is malformed (rather than cut off by
+    the chunk boundary) is yielded as a MalformedRow and parsing resumes on
+    the next line; without a next line to resume on, parsing stops with a
+    ValueError.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    pos = 0
+    eof = False
+    index = 0
+    in_array = None
+
+    while True:
+        match = _SEPARATORS.match(buffer, pos)
+        pos = match.end()
+
+        if pos >= len(buffer):
+            if eof:
+                break
+            chunk = reader.read(CHUNK_SIZE)
+            eof = not chunk
+            buffer, pos = buffer[pos:] + chunk, 0
+            continue
+
+        if in_array is None:
+            in_array = buffer[pos] == '['
+            if in_array:
+                pos += 1
+            continue
+
+        if in_array and buffer[pos] == ']':
+            break
+
+        try:
+            value, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError as err:
+            truncated = err.pos >= len(buffer) - _MAX_TOKEN or err.msg.startswith('Unterminated string')
+            if truncated and not eof:
+                chunk = reader.read(CHUNK_SIZE)
+                eof = not chunk
+                buffer, pos = buffer[pos:] + chunk, 0
+                continue
+            next_line = buffer.find('\n', err.pos)
+            if next_line == -1:
+                raise ValueError(f'Malformed JSON after row {index}: {err.msg}')
+            index += 1
+            yield index, MalformedRow(f'Malformed JSON: {err.msg}')
+            pos = next_line + 1
+            continue
+
+        pos = end
+        index += 1
+        yield index, value
+
+
+def _text(row, key):
+    value = row.get(key)
+    return str(value).strip() if value is not None else ''
+
+
+def validate_row(row, assignee_ids):
+    """
+    Convert one uploaded row into Task column values
+
+    Raises ValueError with a user-facing message when the row is invalid.
+    """
+    if isinstance(row, MalformedRow):
+        raise ValueError(row.message)
+    if not isinstance(row, dict):
+        raise ValueError('Row must be an object')
+
+    title = _text(row, 'title')
+    role = _text(row, 'role')
+    deadline_str = _text(row, 'deadline')
+    if not title or not role or not deadline_str:
+        raise ValueError('title, role and deadline are required')
+    if len(title) > 200:
+        raise ValueError('title is longer than 200 characters')
+
+    try:
+        deadline = datetime.strptime(deadline_str, '%Y-%m-%d')
+    except ValueError:
+        raise ValueError('deadline must be YYYY-MM-DD')
+
+    priority = _text(row, 'priority') or 'Medium'
+    if priority not in PRIORITIES:
+        raise ValueError(f'priority must be one of {", ".join(PRIORITIES)}')
+
+    try:
+        estimated_hours = int(row.get('estimated_hours') or 0)
+    except (TypeError, ValueError):
+        raise ValueError('estimated_hours must be a whole number')
+    if estimated_hours < 0:
+        raise ValueError('estimated_hours cannot be negative')
+
+    assignee_id = row.get('assignee_id')
+    if assignee_id in (None, ''):
+        assignee_id = None
+    elif str(assignee_id).strip().lower() == AUTO:
+        assignee_id = AUTO
+    else:
+        try:
+            assignee_id = int(assignee_id)
+        except (TypeError, ValueError):
+            raise ValueError('assignee_id must be a user id')
+        if assignee_id not in assignee_ids:
+            raise ValueError(f'assignee_id {assignee_id} is not an active team member')
+
+    return {
+        'title': title,
+        'description': _text(row, 'description') or None,
+        'role': role,
+        'priority': priority,
+        'deadline': deadline,
+        'estimated_hours': estimated_hours,
+        'assignee_id': assignee_id,
+        'status': 'Pending',
+        'progress': 0
+    }
+
+
+def import_tasks(project_id, created_by_id, rows, batch_size=BATCH_SIZE, auto_assign=False):
+    """
+    Validate and insert streamed rows for a project in a single transaction
+
+    Invalid rows are skipped and reported; valid rows are written with one
+    executemany INSERT per batch. Rows whose assignee_id is "auto" (and, with
+    auto_assign, rows without one) are balanced across the team by an
+    AutoAssigner. Returns an ImportSummary.
+    """
+    assignee_ids = set(db.session.execute(
+        select(User.id).where(User.role == 'team_member', User.is_active.is_(True))
+    ).scalars())
+
+    summary = ImportSummary()
+    batch = []
+    assigner = None
+
+    try:
+        for line, row in rows:
+            try:
+                values = validate_row(row, assignee_ids)
+            except ValueError as e:
+                summary.add_error(line, str(e))
+                continue
+
+            if values['assignee_id'] == AUTO or (auto_assign and values['assignee_id'] is None):
+                if assigner is None:
+                    assigner = AutoAssigner(project_id)
+                values['assignee_id'] = assigner.pick(values['role'], values['estimated_hours'])
+
+            values['project_id'] = project_id
+            values['created_by_id'] = created_by_id
+            batch.append(values)
+            if values['assignee_id']:
+                summary.add_assignment(values['assignee_id'], values['title'])
+
+            if len(batch) >= batch_size:
+                db.session.execute(insert(Task), batch)
+                summary.imported += len(batch)
+                batch = []
+
+        if batch:
+            db.session.execute(insert(Task), batch)
+            summary.imported += len(batch)
+
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return summary
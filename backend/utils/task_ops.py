@@ -0,0 +1,169 @@
+"""
+Bulk Task Operations for SupportSphere
+Set-based reassignment, status and deadline changes across many tasks
+"""
+
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, update, func
+
+from extensions import db
+from models import Task, Project, User
+
+MAX_BULK_TASKS = 10000
+TASK_STATUSES = ('Pending', 'In Progress', 'Completed', 'Blocked')
+OPERATIONS = ('reassign', 'status', 'shift_deadline')
+
+AffectedTask = namedtuple('AffectedTask', 'id title project_id assignee_id status')
+
+
+class BulkOperationError(ValueError):
+    """Raised when a bulk request is invalid; the message is user-facing"""
+
+
+def recalculate_project_progress(project_ids):
+    """
+    Recompute projects' progress as the integer mean of their tasks' progress
+
+    Runs as one correlated UPDATE for all given projects. Projects without
+    tasks keep their current progress.
+    """
+    if not project_ids:
+        return
+    totals = select(func.sum(Task.progress) / func.count(Task.id))\
+        .where(Task.project_id == Project.id)\
+        .scalar_subquery()
+    has_tasks = select(Task.id).where(Task.project_id == Project.id).exists()
+    db.session.execute(
+        update(Project)
+        .where(Project.id.in_(project_ids), has_tasks)
+        .values(progress=totals)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def parse_request(data):
+    """
+    Validate a bulk request payload
+
+    Returns (task_ids, operation, values) or raises BulkOperationError.
+    """
+    try:
+        task_ids = sorted({int(task_id) for task_id in data.get('task_ids') or []})
+    except (TypeError, ValueError):
+        raise BulkOperationError('task_ids must be a list of task ids')
+    if not task_ids:
+        raise BulkOperationError('No tasks selected')
+    if len(task_ids) > MAX_BULK_TASKS:
+        raise BulkOperationError(f'At most {MAX_BULK_TASKS} tasks can be changed at once')
+
+    operation = data.get('operation')
+    if operation not in OPERATIONS:
+        raise BulkOperationError(f'operation must be one of {", ".join(OPERATIONS)}')
+
+    if operation == 'reassign':
+        try:
+            assignee_id = int(data.get('assignee_id'))
+        except (TypeError, ValueError):
+            raise BulkOperationError('assignee_id is required for reassign')
+        assignee = db.session.execute(
+            select(User.id).where(User.id == assignee_id, User.role == 'team_member', User.is_active.is_(True))
+        ).scalar()
+        if assignee is None:
+            raise BulkOperationError(f'User {assignee_id} is not an active team member')
+        return task_ids, operation, {'assignee_id': assignee_id}
+
+    if operation == 'status':
+        status = data.get('status')
+        if status not in TASK_STATUSES:
+            raise BulkOperationError(f'status must be one of {", ".join(TASK_STATUSES)}')
+        return task_ids, operation, {'status': status}
+
+    try:
+        days = int(data.get('days'))
+    except (TypeError, ValueError):
+        raise BulkOperationError('days is required for shift_deadline')
+    if days == 0:
+        raise BulkOperationError('days must not be zero')
+    return task_ids, operation, {'days': days}
+
+
+def apply_bulk_operation(task_ids, operation, values):
+    """
+    Apply one operation to all given tasks with a single UPDATE (an
+    executemany one for deadline shifts)
+
+    Returns the list of AffectedTask rows as they were before the change;
+    ids that do not exist are ignored.
+    """
+    affected = [AffectedTask(*row) for row in db.session.execute(
+        select(Task.id, Task.title, Task.project_id, Task.assignee_id, Task.status).where(Task.id.in_(task_ids))
+    )]
+    if not affected:
+        return affected
+
+    ids = [task.id for task in affected]
+    if operation == 'reassign':
+        changes = {'assignee_id': values['assignee_id'], 'status': 'In Progress'}
+    elif operation == 'status':
+        changes = {'status': values['status']}
+        if values['status'] == 'Completed':
+            changes.update(completed_at=datetime.utcnow(), progress=100)
+    else:
+        changes = None
+
+    try:
+        if changes is None:
+            # New deadlines are computed here rather than with dialect-specific
+            # date SQL, and written back in one executemany UPDATE by primary key
+            delta = timedelta(days=values['days'])
+            deadlines = [{'id': task_id, 'deadline': deadline + delta} for task_id, deadline in db.session.execute(
+                select(Task.id, Task.deadline).where(Task.id.in_(ids))
+            )]
+            db.session.execute(update(Task), deadlines)
+        else:
+            db.session.execute(
+                update(Task)
+                .where(Task.id.in_(ids))
+                .values(**changes)
+                .execution_options(synchronize_session=False)
+            )
+        if operation == 'status':
+            recalculate_project_progress({task.project_id for task in affected})
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    return affected
+
+
+def notification_groups(affected, operation, values, actor_id):
+    """
+    Group changed tasks by the user who should hear about them
+
+    Returns (notification setting, {user id: [AffectedTask]}). A reassignment
+    notifies the new assignee about tasks that were not already theirs; other
+    operations notify each task's assignee, except the user making the change.
+    """
+    if operation == 'reassign':
+        assignee_id = values['assignee_id']
+        tasks = [task for task in affected if task.assignee_id != assignee_id]
+        return 'task_assigned', {assignee_id: tasks} if tasks else {}
+
+    by_user = {}
+    for task in affected:
+        if task.assignee_id and task.assignee_id != actor_id:
+            by_user.setdefault(task.assignee_id, []).append(task)
+    return 'team_update', by_user
+
+
+def describe_operation(operation, values, count):
+    """One-sentence summary of a bulk change for notification emails"""
+    plural = 's' if count != 1 else ''
+    if operation == 'reassign':
+        return f"You have been assigned {count} task{plural}."
+    if operation == 'status':
+        return f"The status of {count} of your task{plural} changed to {values['status']}."
+    return f"The deadline of {count} of your task{plural} moved by {values['days']:+d} day(s)."
@@ -0,0 +1,255 @@
+"""
+Request Tracing for SupportSphere
+Minimal in-process spans exported as OpenTelemetry (OTLP/JSON) trace files
+
+A span is opened for every request, with child spans for SQL statements,
+template renders and email dispatch. Code can add its own with
+
+    with span('notifications.recipients'):
+        ...
+
+When a request (or a background job it started) finishes, its spans are
+appended to TRACE_FILE as one OTLP ExportTraceServiceRequest per line, the
+layout the OpenTelemetry collector's file exporter uses, so it can be
+replayed into Jaeger or Tempo, or read with jq. The trace id is the
+request id from utils/log.py, so traces and log lines correlate.
+
+Tracing is off unless TRACE_FILE is set; span() then does nothing.
+"""
+
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from flask import g, request, template_rendered, before_render_template
+
+from utils import query_audit
+
+SERVICE_NAME = 'supportsphere'
+MAX_STATEMENT_LENGTH = 1000
+
+# OTLP enum values
+KIND_INTERNAL = 1
+KIND_SERVER = 2
+KIND_CLIENT = 3
+STATUS_UNSET = 0
+STATUS_ERROR = 2
+
+_TRACE_ID = re.compile(r'^[0-9a-f]{32}$')
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar('trace_span', default=None)
+_config = {'file': None, 'sample_rate': 1.0}
+_write_lock = threading.Lock()
+
+
+class Span:
+    """One timed operation; spans of a local root are exported together"""
+    __slots__ = ('trace_id', 'span_id', 'parent_id', 'name', 'kind', 'start', 'end',
+                 'attributes', 'status', 'message', 'root', 'finished')
+
+    def __init__(self, name, kind, trace_id, parent_id, attributes, root=None):
+        self.trace_id = trace_id
+        self.span_id = f'{random.getrandbits(64):016x}'
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start = time.time_ns()
+        self.end = None
+        self.attributes = attributes
+        self.status = STATUS_UNSET
+        self.message = None
+        # The local root collects its finished descendants
+        self.root = root or self
+        self.finished = [] if root is None else None
+
+    def child(self, name, kind=KIND_INTERNAL, **attributes):
+        return Span(name, kind, self.trace_id, self.span_id, attributes, self.root)
+
+    def set_error(self, exc):
+        self.status = STATUS_ERROR
+        self.message = f'{type(exc).__name__}: {exc}'
+
+    def finish(self, end=None):
+        self.end = end or time.time_ns()
+        self.root.finished.append(self)
+        if self.root is self:
+            _export(self.finished)
+
+
+@contextmanager
+def span(name, **attributes):
+    """Time a block as a child of the current span; no-op when nothing is being traced"""
+    parent = _current.get()
+    if parent is None:
+        yield None
+        return
+    child = parent.child(name, **attributes)
+    token = _current.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.set_error(e)
+        raise
+    finally:
+        _current.reset(token)
+        child.finish()
+
+
+def traced(name, target):
+    """
+    Wrap a thread target so it runs in a span under the caller's current span
+
+    The span is a local root of its own: it is exported when the background
+    work finishes, with the request's span as its parent.
+    """
+    parent = _current.get()
+    if parent is None:
+        return target
+
+    def run(*args, **kwargs):
+        root = Span(name, KIND_INTERNAL, parent.trace_id, parent.span_id, {'thread': threading.current_thread().name})
+        token = _current.set(root)
+        try:
+            return target(*args, **kwargs)
+        except BaseException as e:
+            root.set_error(e)
+            raise
+        finally:
+            _current.reset(token)
+            root.finish()
+    return run
+
+
+# ==================== EXPORT ====================
+
+def _value(value):
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def _otlp(spans):
+    return {'resourceSpans': [{
+        'resource': {'attributes': [{'key': 'service.name', 'value': {'stringValue': SERVICE_NAME}},
+                                    {'key': 'process.pid', 'value': {'intValue': str(os.getpid())}}]},
+        'scopeSpans': [{
+            'scope': {'name': __name__},
+            'spans': [{
+                'traceId': s.trace_id,
+                'spanId': s.span_id,
+                'parentSpanId': s.parent_id or '',
+                'name': s.name,
+                'kind': s.kind,
+                'startTimeUnixNano': str(s.start),
+                'endTimeUnixNano': str(s.end),
+                'attributes': [{'key': key, 'value': _value(value)}
+                               for key, value in s.attributes.items() if value is not None],
+                'status': {'code': s.status, 'message': s.message} if s.message else {'code': s.status}
+            } for s in spans]
+        }]
+    }]}
+
+
+def _export(spans):
+    line = json.dumps(_otlp(spans), separators=(',', ':'))
+    try:
+        with _write_lock, open(_config['file'], 'a') as f:
+            f.write(line + '\n')
+    except OSError as e:
+        # Tracing must never break the traced code
+        logger.warning('Could not write trace: %s', e)
+
+
+# ==================== INSTRUMENTATION ====================
+
+def _before_request():
+    if random.random() >= _config['sample_rate']:
+        return
+    request_id = g.get('request_id', '')
+    trace_id = request_id if _TRACE_ID.match(request_id) else f'{random.getrandbits(128):032x}'
+    root = Span(f'{request.method} {request.url_rule.rule if request.url_rule else request.path}',
+                KIND_SERVER, trace_id, None,
+                {'http.method': request.method, 'http.target': request.path,
+                 'http.route': request.url_rule.rule if request.url_rule else None,
+                 'flask.endpoint': request.endpoint})
+    g._trace = (root, _current.set(root))
+
+
+def _after_request(response):
+    trace = g.get('_trace')
+    if trace is not None:
+        trace[0].attributes['http.status_code'] = response.status_code
+    return response
+
+
+def _teardown_request(exc):
+    trace = g.pop('_trace', None)
+    if trace is None:
+        return
+    root, token = trace
+    root.attributes['db.queries'] = query_audit.request_stats()[0]
+    if exc is not None:
+        root.set_error(exc)
+        root.attributes['http.status_code'] = 500
+    _current.reset(token)
+    root.finish()
+
+
+def _statement_finished(conn, statement, start, end, rowcount, error):
+    # Called by query_audit's engine hooks, which time every statement once
+    parent = _current.get()
+    if parent is None:
+        return
+    child = parent.child('db.query', KIND_CLIENT, **{'db.system': conn.dialect.name,
+                                                     'db.statement': statement[:MAX_STATEMENT_LENGTH],
+                                                     'db.rows': rowcount})
+    child.start = start
+    if error is not None:
+        child.set_error(error)
+    child.finish(end)
+
+
+def _before_render(sender, template, context, **extra):
+    parent = _current.get()
+    if parent is None:
+        return
+    child = parent.child('render', **{'template.name': template.name or '<string>'})
+    g.setdefault('_trace_templates', []).append((child, _current.set(child)))
+
+
+def _template_rendered(sender, template, context, **extra):
+    stack = g.get('_trace_templates')
+    if stack:
+        child, token = stack.pop()
+        _current.reset(token)
+        child.finish()
+
+
+def init_app(app):
+    """Trace requests, SQL, template renders and emails when TRACE_FILE is configured"""
+    trace_file = app.config.get('TRACE_FILE')
+    if not trace_file:
+        return
+    _config['file'] = trace_file
+    _config['sample_rate'] = float(app.config.get('TRACE_SAMPLE_RATE', 1.0))
+    os.makedirs(os.path.dirname(os.path.abspath(trace_file)), exist_ok=True)
+
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+    before_render_template.connect(_before_render, app)
+    template_rendered.connect(_template_rendered, app)
+    query_audit.install()
+    query_audit.add_listener(_statement_finished)
@@ -0,0 +1,85 @@
+"""
+User Snapshot Cache for SupportSphere
+Serves Flask-Login's user loader from memory instead of the users table
+
+Snapshots are read-only copies of a user and their notification settings,
+stamped with the user's version from utils.cache. Any write to a user or
+their settings must call invalidate_user() so the next request reloads it.
+Routes that modify the user load the ORM row explicitly with orm_user().
+"""
+
+import os
+
+from flask_login import UserMixin
+from sqlalchemy import select
+
+from extensions import db
+from models import User, NotificationSettings
+from utils.cache import LRUCache, bump, version
+
+USER_COLUMNS = ('id', 'name', 'email', 'role', 'avatar', 'theme', 'is_active')
+SETTINGS_COLUMNS = tuple(
+    column.key for column in NotificationSettings.__table__.columns
+    if column.key not in ('id', 'user_id', 'created_at', 'updated_at')
+)
+
+_snapshots = LRUCache(maxsize=int(os.getenv('USER_CACHE_SIZE', 1024)))
+
+
+class SettingsSnapshot:
+    """Read-only copy of a user's NotificationSettings"""
+    __slots__ = SETTINGS_COLUMNS
+
+    should_send_email = NotificationSettings.should_send_email
+    is_quiet_hours = NotificationSettings.is_quiet_hours
+
+    def __init__(self, values):
+        for key, value in zip(SETTINGS_COLUMNS, values):
+            setattr(self, key, value)
+
+
+class UserSnapshot(UserMixin):
+    """Read-only copy of a User, used as Flask-Login's current_user"""
+    __slots__ = USER_COLUMNS + ('notification_settings',)
+
+    def __init__(self, values, notification_settings):
+        for key, value in zip(USER_COLUMNS, values):
+            setattr(self, key, value)
+        self.notification_settings = notification_settings
+
+
+def load_user_snapshot(user_id):
+    """Return the cached snapshot for a user, reloading it if stale or missing"""
+    current = version('user', user_id)
+    entry = _snapshots.get(user_id)
+    if entry is not None and entry[0] == current:
+        return entry[1]
+
+    columns = [getattr(User, key) for key in USER_COLUMNS] + \
+              [getattr(NotificationSettings, key) for key in SETTINGS_COLUMNS] + \
+              [NotificationSettings.id]
+    stmt = select(*columns)\
+        .outerjoin(NotificationSettings, NotificationSettings.user_id == User.id)\
+        .where(User.id == user_id)
+    row = db.session.execute(stmt).first()
+    if row is None:
+        return None
+
+    user_values = row[:len(USER_COLUMNS)]
+    settings = None
+    if row[-1] is not None:
+        settings = SettingsSnapshot(row[len(USER_COLUMNS):-1])
+
+    snapshot = UserSnapshot(user_values, settings)
+    _snapshots.set(user_id, (current, snapshot))
+    return snapshot
+
+
+def invalidate_user(user_id):
+    """Mark a user's snapshot (and fragments showing the user) as stale"""
+    bump('user', user_id)
+
+
+def orm_user(user_id):
+    """Load the tracked User row for routes that modify it"""
+    return db.session.get(User, user_id)
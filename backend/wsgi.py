@@ -0,0 +1,23 @@
+"""
+WSGI entry point for SupportSphere
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+With preload_app (the default in gunicorn.conf.py) this module is imported
+once in the gunicorn master, so the schema is created and seeded once
+before any worker is forked.
+"""
+
+import os
+
+from app import create_app, init_db
+from extensions import db
+
+app = create_app()
+
+if os.getenv('INIT_DB', 'True') == 'True':
+    init_db(app)
+
+# Workers must not share the master's pooled database connections
+with app.app_context():
+    db.engine.dispose()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+"""
+Dashboard Projection Benchmark
+Compares ORM entity loading against utils.projections for dashboard rendering
+
+Usage: python benchmarks/dashboard_projections.py [--rows 10000] [--repeat 5]
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, render_template_string
+from extensions import db
+from models import User, Project, TeamMember
+from utils.projections import project_cards
+
+
+# Same fields the manager dashboard renders for each project row
+ORM_TEMPLATE = """
+{% for project in projects %}{{ project.title }}|{{ project.status }}|{{ project.progress }}|{{ project.days_remaining }}|{% for tm in project.team_members[:3] %}{{ tm.member.name }},{% endfor %}{{ project.team_members|length }}
+{% endfor %}
+"""
+
+PROJECTION_TEMPLATE = """
+{% for project in projects %}{{ project.title }}|{{ project.status }}|{{ project.progress }}|{{ project.days_remaining }}|{% for name in project.member_names[:3] %}{{ name }},{% endfor %}{{ project.member_names|length }}
+{% endfor %}
+"""
+
+
+def create_benchmark_app():
+    """Standalone app on an in-memory database"""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+
+def seed(rows):
+    """Insert one manager, a customer, ten team members and `rows` projects"""
+    now = datetime.utcnow()
+    users = [
+        {'name': 'Manager', 'email': 'manager@bench.local', 'password_hash': 'x', 'role': 'manager'},
+        {'name': 'Customer', 'email': 'customer@bench.local', 'password_hash': 'x', 'role': 'customer'},
+    ] + [
+        {'name': f'Member {i}', 'email': f'member{i}@bench.local', 'password_hash': 'x', 'role': 'team_member'}
+        for i in range(10)
+    ]
+    db.session.execute(db.insert(User), users)
+
+    description = 'Lorem ipsum dolor sit amet. ' * 80
+    db.session.execute(db.insert(Project), [{
+        'title': f'Project {i}',
+        'description': description,
+        'complexity': ('Low', 'Medium', 'High')[i % 3],
+        'status': ('Pending', 'In Progress', 'Completed')[i % 3],
+        'progress': i % 101,
+        'created_at': now - timedelta(minutes=i),
+        'deadline': now + timedelta(days=i % 90),
+        'customer_id': 2,
+        'manager_id': 1,
+    } for i in range(rows)])
+
+    db.session.execute(db.insert(TeamMember), [{
+        'project_id': project_id,
+        'user_id': 3 + (project_id + offset) % 10,
+        'role': 'Developer',
+    } for project_id in range(1, rows + 1) for offset in range(3)])
+    db.session.commit()
+
+
+def load_orm():
+    return Project.query.order_by(Project.created_at.desc()).all()
+
+
+def load_projection():
+    return project_cards(order_by=Project.created_at.desc(), with_members=True)
+
+
+def measure(loader, template, repeat):
+    """Return (best seconds, peak bytes) for loading and rendering"""
+    best = None
+    peak = 0
+    for _ in range(repeat):
+        db.session.expunge_all()
+        tracemalloc.start()
+        start = time.perf_counter()
+        render_template_string(template, projects=loader())
+        elapsed = time.perf_counter() - start
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        best = elapsed if best is None else min(best, elapsed)
+    return best, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    app = create_benchmark_app()
+    with app.app_context():
+        db.create_all()
+        seed(args.rows)
+
+        with app.test_request_context():
+            orm_time, orm_peak = measure(load_orm, ORM_TEMPLATE, args.repeat)
+            dto_time, dto_peak = measure(load_projection, PROJECTION_TEMPLATE, args.repeat)
+
+    print(f"Dashboard rendering, {args.rows} projects (best of {args.repeat})")
+    print("=" * 60)
+    print(f"{'path':<12}{'time (ms)':>14}{'peak memory (MiB)':>22}")
+    print(f"{'ORM':<12}{orm_time * 1000:>14.1f}{orm_peak / 2**20:>22.1f}")
+    print(f"{'projection':<12}{dto_time * 1000:>14.1f}{dto_peak / 2**20:>22.1f}")
+    print(f"\nSpeedup: {orm_time / dto_time:.1f}x, memory: {orm_peak / dto_peak:.1f}x less")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,292 @@
+#!/usr/bin/env python
+"""
+Route Latency Benchmark
+Drives the hot endpoints through the Flask test client against a synthetic
+dataset and checks query budgets (and, with --strict, latency and memory
+budgets) against a baseline
+
+Every endpoint is requested --requests times cold, with the rendered
+fragment and row caches cleared before each request, and --requests times
+warm, after --warmup untimed requests, as the user who would normally call
+it. Reported per endpoint and mode: p50/p95/p99 latency and SQL queries per
+request (from the SQL audit's X-SQL-Queries header), plus the peak Python
+memory of one cold request (from tracemalloc, measured in separate runs so
+tracing does not skew latency). Writes run last, so the reads see the
+dataset as generated.
+
+An endpoint is over budget when it runs more queries, cold or warm, than
+the baseline. Query counts depend only on the code and the dataset;
+latency and memory also depend on the machine and interpreter, so a p95 or
+peak memory more than --tolerance above the baseline is only reported,
+unless --strict is given to compare against a baseline recorded on this
+machine. Exits with status 1 when any endpoint is over budget or fails.
+
+Usage: python benchmarks/route_latency.py [--scale 1.0] [--requests 50]
+                                          [--dataset generated.db]
+                                          [--baseline benchmarks/route_baseline.json]
+                                          [--save-baseline] [--tolerance 0.3] [--strict]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from sqlalchemy import func
+
+from app import create_app
+from extensions import db
+from models import User, Project, TeamMember, Task, ChatMessage
+from utils import synthetic_data
+from utils.cache import fragment_cache, row_cache
+
+DEFAULT_BASELINE = os.path.join(ROOT, 'benchmarks', 'route_baseline.json')
+MEMORY_RUNS = 3
+MODES = ('cold', 'warm')
+
+
+def build_dataset(path, scale, seed):
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}'}, with_routes=False)
+    with app.app_context():
+        db.create_all()
+        synthetic_data.generate(scale, seed)
+        db.session.remove()
+        db.engine.dispose()
+
+
+def pick_targets():
+    """The busiest project with open work, one of its open tasks and the users who work on it"""
+    open_tasks = Task.query.join(TeamMember, (TeamMember.user_id == Task.assignee_id) &
+                                 (TeamMember.project_id == Task.project_id))\
+        .filter(Task.status != 'Completed')
+    project_id = db.session.query(ChatMessage.project_id)\
+        .filter(ChatMessage.project_id.in_(open_tasks.with_entities(Task.project_id)))\
+        .group_by(ChatMessage.project_id)\
+        .order_by(func.count().desc(), ChatMessage.project_id).limit(1).scalar()
+    project = db.session.get(Project, project_id)
+    task = open_tasks.filter(Task.project_id == project_id).order_by(Task.id).first()
+    return {
+        'project_id': project_id,
+        'task_id': task.id,
+        'emails': {
+            'manager': db.session.get(User, project.manager_id).email,
+            'team_member': db.session.get(User, task.assignee_id).email,
+            'customer': db.session.get(User, project.customer_id).email
+        }
+    }
+
+
+def endpoints(targets):
+    """(name, role, method, path, form data or None, expected status); writes last"""
+    project_id, task_id = targets['project_id'], targets['task_id']
+    return [
+        ('manager.dashboard', 'manager', 'GET', '/manager/dashboard', None, 200),
+        ('team.dashboard', 'team_member', 'GET', '/team/dashboard', None, 200),
+        ('customer.dashboard', 'customer', 'GET', '/customer/dashboard', None, 200),
+        ('manager.project_detail', 'manager', 'GET', f'/manager/project/{project_id}', None, 200),
+        ('customer.project_detail', 'customer', 'GET', f'/customer/projects/{project_id}', None, 200),
+        ('chat.get_messages', 'customer', 'GET', f'/chat/project/{project_id}/messages', None, 200),
+        ('manager.reports', 'manager', 'GET', '/manager/reports', None, 200),
+        ('chat.send_message', 'customer', 'POST', f'/chat/project/{project_id}/send',
+         {'message': 'Benchmark message'}, 200),
+        ('team.update_progress', 'team_member', 'POST', f'/team/task/{task_id}/update-progress',
+         {'progress': 50}, 302),
+    ]
+
+
+def login(app, email):
+    client = app.test_client()
+    response = client.post('/auth/login', data={'email': email, 'password': synthetic_data.PASSWORD})
+    if response.status_code != 302:
+        raise RuntimeError(f'Could not log in as {email}')
+    return client
+
+
+def call(client, method, path, data, expected):
+    start = time.perf_counter()
+    response = client.open(path, method=method, data=data,
+                           headers={'X-Requested-With': 'XMLHttpRequest'})
+    elapsed = time.perf_counter() - start
+    if response.status_code != expected:
+        raise RuntimeError(f'{method} {path} returned {response.status_code}, expected {expected}')
+    return elapsed, int(response.headers.get('X-SQL-Queries', 0)), response.headers.get('X-SQL-N-Plus-One')
+
+
+def clear_fragments():
+    """Drop every rendered fragment and row, so the next request renders from the database"""
+    fragment_cache.clear()
+    row_cache.clear()
+
+
+def measure(client, method, path, data, expected, requests, warmup):
+    result, suspects = {}, None
+    for mode in MODES:
+        if mode == 'warm':
+            for _ in range(warmup):
+                call(client, method, path, data, expected)
+
+        latencies, queries = [], []
+        for _ in range(requests):
+            if mode == 'cold':
+                clear_fragments()
+            elapsed, count, n_plus_one = call(client, method, path, data, expected)
+            latencies.append(elapsed * 1000)
+            queries.append(count)
+            suspects = suspects or n_plus_one
+
+        percentiles = statistics.quantiles(latencies, n=100, method='inclusive')
+        result[mode] = {
+            'p50_ms': round(percentiles[49], 2),
+            'p95_ms': round(percentiles[94], 2),
+            'p99_ms': round(percentiles[98], 2),
+            'queries': max(queries)
+        }
+
+    peak = 0
+    tracemalloc.start()
+    for _ in range(MEMORY_RUNS):
+        clear_fragments()
+        tracemalloc.reset_peak()
+        call(client, method, path, data, expected)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+    tracemalloc.stop()
+
+    result['peak_kib'] = round(peak / 1024, 1)
+    result['n_plus_one'] = suspects
+    return result
+
+
+def over_budget(result, budget, tolerance):
+    """
+    (query regressions, latency and memory regressions) of a result against
+    its baseline budget, each a list of reasons, empty if within budget
+    """
+    queries, timings = [], []
+    for mode in MODES:
+        measured, allowed = result[mode], budget[mode]
+        if measured['queries'] > allowed['queries']:
+            queries.append(f"{mode} {measured['queries']} queries > {allowed['queries']}")
+        if measured['p95_ms'] > allowed['p95_ms'] * (1 + tolerance):
+            timings.append(f"{mode} p95 {measured['p95_ms']:.1f} ms > {allowed['p95_ms']:.1f} ms")
+    if result['peak_kib'] > budget['peak_kib'] * (1 + tolerance):
+        timings.append(f"peak {result['peak_kib']:.0f} KiB > {budget['peak_kib']:.0f} KiB")
+    return queries, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scale', type=float, default=1.0)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--requests', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--dataset', help='database made by generate_data.py with the same --scale and '
+                                          '--seed; copied, so runs start from the same data')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='write the results to --baseline instead of comparing')
+    parser.add_argument('--tolerance', type=float, default=0.3,
+                        help='allowed relative increase of p95 latency and peak memory')
+    parser.add_argument('--strict', action='store_true',
+                        help='also fail on latency and memory regressions; only meaningful '
+                             'against a baseline recorded on this machine')
+    args = parser.parse_args()
+
+    baseline = None
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if (baseline['scale'], baseline['seed']) != (args.scale, args.seed):
+            print(f"Baseline was recorded with --scale {baseline['scale']} --seed {baseline['seed']}")
+            sys.exit(2)
+        if any('cold' not in budget for budget in baseline['endpoints'].values()):
+            print("Baseline predates cold/warm runs; record it again with --save-baseline")
+            sys.exit(2)
+
+    scratch = tempfile.mkdtemp(prefix='supportsphere-routes-')
+    path = os.path.join(scratch, 'bench.db')
+    try:
+        if args.dataset:
+            shutil.copyfile(args.dataset, path)
+        else:
+            print(f"Generating synthetic dataset (scale {args.scale}, seed {args.seed})...")
+            start = time.perf_counter()
+            build_dataset(path, args.scale, args.seed)
+            print(f"  done in {time.perf_counter() - start:.1f}s")
+
+        app = create_app({
+            'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+            'SQL_AUDIT': 'on',
+            'LOG_LEVEL': 'ERROR',
+            'MAIL_SUPPRESS_SEND': True
+        })
+        with app.app_context():
+            targets = pick_targets()
+        clients = {role: login(app, email) for role, email in targets['emails'].items()}
+
+        results, failures = {}, {}
+        for name, role, method, url, data, expected in endpoints(targets):
+            try:
+                results[name] = measure(clients[role], method, url, data, expected,
+                                        args.requests, args.warmup)
+            except Exception as e:
+                failures[name] = f'{type(e).__name__}: {e}'
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    print(f"\n{args.requests} cold and {args.requests} warm requests per endpoint, "
+          f"scale {args.scale}, project {targets['project_id']}")
+    print("=" * 104)
+    print(f"{'':<26}{'cold ms':>18}{'warm ms':>18}{'queries':>12}")
+    print(f"{'endpoint':<26}{'p50':>9}{'p95':>9}{'p50':>9}{'p95':>9}{'cold':>6}{'warm':>6}"
+          f"{'peak KiB':>11}  budget")
+    regressions = dict(failures)
+    for name, result in results.items():
+        budget = (baseline or {}).get('endpoints', {}).get(name)
+        if baseline is None:
+            status = ''
+        elif budget is None:
+            status = 'new'
+        else:
+            queries, timings = over_budget(result, budget, args.tolerance)
+            failed = queries + timings if args.strict else queries
+            advisory = [] if args.strict else timings
+            status = 'OVER: ' + '; '.join(failed) if failed else 'ok'
+            if advisory:
+                status += ' (slower: ' + '; '.join(advisory) + ')'
+            if failed:
+                regressions[name] = status
+        cold, warm = result['cold'], result['warm']
+        print(f"{name:<26}{cold['p50_ms']:>9.1f}{cold['p95_ms']:>9.1f}{warm['p50_ms']:>9.1f}{warm['p95_ms']:>9.1f}"
+              f"{cold['queries']:>6}{warm['queries']:>6}{result['peak_kib']:>11.0f}  {status}")
+        if result['n_plus_one']:
+            print(f"{'':<26}repeated queries: {result['n_plus_one']}")
+    for name, error in failures.items():
+        print(f"{name:<26}FAILED  {error}")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump({
+                'scale': args.scale,
+                'seed': args.seed,
+                'requests': args.requests,
+                'endpoints': {name: {key: value for key, value in result.items() if key != 'n_plus_one'}
+                              for name, result in results.items()}
+            }, f, indent=2)
+            f.write('\n')
+        print(f"\nBaseline written to {os.path.relpath(args.baseline)}")
+    elif baseline is None:
+        print(f"\nNo baseline at {os.path.relpath(args.baseline)}; record one with --save-baseline")
+
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+"""
+Serving Throughput Benchmark
+Compares the Werkzeug development server (what `python app.py` runs) with
+gunicorn using gunicorn.conf.py, on a scratch copy of the sample database
+
+Usage: python benchmarks/serving_throughput.py [--seconds 10] [--clients 16]
+                                               [--workers 3] [--threads 4]
+"""
+
+import argparse
+import http.client
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlencode
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PATHS = ['/manager/dashboard', '/manager/team-members/workload', '/']
+LOGIN = {'email': 'manager@supportsphere.com', 'password': 'manager123'}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(port, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'Server on port {port} did not start')
+
+
+def login(port):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    conn.request('POST', '/auth/login', body=urlencode(LOGIN),
+                  headers={'Content-Type': 'application/x-www-form-urlencoded'})
+    response = conn.getresponse()
+    response.read()
+    cookie = response.getheader('Set-Cookie', '').split(';')[0]
+    conn.close()
+    return cookie
+
+
+def client(port, stop, results):
+    cookie = login(port)
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    latencies = []
+    errors = 0
+    i = 0
+    while not stop.is_set():
+        path = PATHS[i % len(PATHS)]
+        i += 1
+        start = time.perf_counter()
+        try:
+            conn.request('GET', path, headers={'Cookie': cookie})
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 400:
+                errors += 1
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            conn.close()
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+    results.append((latencies, errors))
+
+
+def measure(port, seconds, clients):
+    stop = threading.Event()
+    results = []
+    threads = [threading.Thread(target=client, args=(port, stop, results)) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    latencies = sorted(latency for chunk, _ in results for latency in chunk)
+    errors = sum(count for _, count in results)
+    if not latencies:
+        return {'rps': 0, 'p50': 0, 'p99': 0, 'errors': errors}
+    return {
+        'rps': len(latencies) / seconds,
+        'p50': latencies[len(latencies) // 2] * 1000,
+        'p99': latencies[int(len(latencies) * 0.99)] * 1000,
+        'errors': errors
+    }
+
+
+def run_server(command, env, port, seconds, clients):
+    process = subprocess.Popen(command, cwd=ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for(port)
+        measure(port, 1, 2)  # warm up caches and connections
+        return measure(port, seconds, clients)
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--seconds', type=int, default=10)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--workers', type=int, default=3)
+    parser.add_argument('--threads', type=int, default=4)
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix='supportsphere-bench-')
+    env = dict(os.environ,
+               DATABASE_URL=f"sqlite:///{os.path.join(scratch, 'bench.db')}",
+               WEB_CONCURRENCY=str(args.workers),
+               GUNICORN_THREADS=str(args.threads),
+               GUNICORN_ACCESS_LOG='',
+               MAIL_SUPPRESS_SEND='True')
+
+    try:
+        port = free_port()
+        dev = run_server(
+            [sys.executable, '-c',
+             'from app import create_app, init_db\n'
+             'app = create_app()\n'
+             'init_db(app)\n'
+             f"app.run(host='127.0.0.1', port={port})"],
+            env, port, args.seconds, args.clients)
+
+        port = free_port()
+        prod = run_server(
+            [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py',
+             '--bind', f'127.0.0.1:{port}', 'wsgi:app'],
+            env, port, args.seconds, args.clients)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    print(f"{args.clients} clients, {args.seconds}s, paths: {', '.join(PATHS)}")
+    print(f"{'server':<40} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for name, result in ((f'werkzeug dev server (python app.py)', dev),
+                         (f'gunicorn gthread {args.workers}x{args.threads}', prod)):
+        print(f"{name:<40} {result['rps']:>8.1f} {result['p50']:>8.1f} {result['p99']:>8.1f} {result['errors']:>7}")
+
+
+if __name__ == '__main__':
+    main()
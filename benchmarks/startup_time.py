@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+"""
+Cold Start Benchmark
+Measures import-to-first-request time of a fresh interpreter, and the
+startup time of the route-free CLI context, against fixed budgets
+
+Each run is a new process, so module imports and template compilation are
+measured cold. Exits with status 1 when a median exceeds its budget.
+
+Usage: python benchmarks/startup_time.py [--runs 5] [--budget-ms 1000]
+                                         [--cli-budget-ms 600]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WEB_BUDGET_MS = 1000
+CLI_BUDGET_MS = 600
+
+WEB_PROBE = """
+import json, time
+start = time.perf_counter()
+from app import create_app
+app = create_app()
+created = time.perf_counter()
+response = app.test_client().get('/auth/login')
+assert response.status_code == 200, response.status_code
+done = time.perf_counter()
+print(json.dumps({'create_ms': (created - start) * 1000, 'total_ms': (done - start) * 1000}))
+"""
+
+CLI_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from app import create_app
+from extensions import db
+from models import User
+app = create_app(with_routes=False)
+with app.app_context():
+    User.query.count()
+done = time.perf_counter()
+assert not any(name.startswith('routes.') for name in sys.modules)
+print(json.dumps({'total_ms': (done - start) * 1000}))
+"""
+
+
+def probe(code, env):
+    output = subprocess.run([sys.executable, '-c', code], cwd=ROOT, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--budget-ms', type=float, default=WEB_BUDGET_MS)
+    parser.add_argument('--cli-budget-ms', type=float, default=CLI_BUDGET_MS)
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix='supportsphere-startup-')
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(scratch, 'startup.db')}")
+    subprocess.run([sys.executable, '-c', 'from app import create_app, init_db; init_db(create_app())'],
+                   cwd=ROOT, env=env, capture_output=True, check=True)
+
+    try:
+        web = [probe(WEB_PROBE, env) for _ in range(args.runs)]
+        cached_env = dict(env, JINJA_BYTECODE_CACHE_DIR=os.path.join(scratch, 'jinja'))
+        probe(WEB_PROBE, cached_env)  # fill the bytecode cache
+        web_cached = [probe(WEB_PROBE, cached_env) for _ in range(args.runs)]
+        cli = [probe(CLI_PROBE, env) for _ in range(args.runs)]
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    results = [
+        ('web: import + create_app', statistics.median(run['create_ms'] for run in web), None),
+        ('web: import to first request', statistics.median(run['total_ms'] for run in web), args.budget_ms),
+        ('web: first request, bytecode cache', statistics.median(run['total_ms'] for run in web_cached),
+         args.budget_ms),
+        ('cli: create_app(with_routes=False) + query', statistics.median(run['total_ms'] for run in cli),
+         args.cli_budget_ms),
+    ]
+
+    over = False
+    print(f"median of {args.runs} cold runs")
+    for name, value, budget in results:
+        status = ''
+        if budget is not None:
+            status = 'ok' if value <= budget else 'OVER BUDGET'
+            status = f'(budget {budget:.0f} ms) {status}'
+            over = over or value > budget
+        print(f"{name:<45} {value:>8.1f} ms  {status}")
+    sys.exit(1 if over else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+"""
+Synthetic Data CLI
+Fills a fresh database with a reproducible dataset for scale testing
+
+Usage:
+    python generate_data.py [--scale 1.0] [--seed 42] [--database-url URL] [--reset]
+
+Scale 1.0 writes about a million rows. The target database defaults to
+DATABASE_URL; use a separate file, e.g.
+    python generate_data.py --database-url sqlite:////tmp/supportsphere-synthetic.db --reset
+All generated users log in with the password printed at the end.
+"""
+
+import argparse
+import sys
+import time
+
+from app import create_app
+from extensions import db
+from utils.synthetic_data import PASSWORD, EMAIL_DOMAIN, generate
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic SupportSphere dataset')
+    parser.add_argument('--scale', type=float, default=1.0, help='size multiplier; 1.0 is about 1M rows')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--database-url', help='target database (defaults to DATABASE_URL)')
+    parser.add_argument('--reset', action='store_true', help='drop and recreate all tables first')
+    args = parser.parse_args()
+
+    config = {'SQLALCHEMY_DATABASE_URI': args.database_url} if args.database_url else None
+    app = create_app(config, with_routes=False)
+
+    start = time.perf_counter()
+    with app.app_context():
+        if args.reset:
+            db.drop_all()
+        db.create_all()
+        try:
+            counts = generate(args.scale, args.seed,
+                              progress=lambda rows: print(f"\r  {rows:,} rows", end='', flush=True))
+        except ValueError as e:
+            print(f"❌ {e} (pass --reset to replace its contents)")
+            return 1
+    print()
+    for table, rows in counts.items():
+        print(f"  {table:<22} {rows:>10,}")
+
+    elapsed = time.perf_counter() - start
+    total = sum(counts.values())
+    print(f"✅ {total:,} rows in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)")
+    print(f"   Log in as manager1@{EMAIL_DOMAIN}, team_member1@{EMAIL_DOMAIN} or "
+          f"customer1@{EMAIL_DOMAIN} with password {PASSWORD}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,80 @@
+"""
+Gunicorn configuration for SupportSphere
+
+Every setting can be tuned through the environment, e.g.
+
+    WEB_CONCURRENCY=4 GUNICORN_THREADS=8 gunicorn -c gunicorn.conf.py wsgi:app
+
+The worker count defaults to DEFAULT_WORKERS, not to the CPU count: in a
+container cpu_count() reports the host's cores rather than the pod's CPU
+limit, and every preloaded worker carries its own caches. Set
+WEB_CONCURRENCY (or GUNICORN_WORKERS) to size it for the machine.
+"""
+
+import gc
+import os
+import tempfile
+
+# Workers write metrics to per-process files in one shared directory;
+# set here so the preloaded app and every worker agree on it. A directory
+# chosen here is the master's to remove on exit
+OWN_METRICS_DIR = 'METRICS_DIR' not in os.environ
+os.environ.setdefault('METRICS_DIR', os.path.join(tempfile.gettempdir(), f'supportsphere-metrics-{os.getpid()}'))
+
+bind = os.getenv('GUNICORN_BIND', f"0.0.0.0:{os.getenv('PORT', '5000')}")
+
+DEFAULT_WORKERS = 2
+
+# Threaded workers: requests mostly wait on SQLite and SMTP, so a few
+# processes with several threads each serve far more than one process
+workers = int(os.getenv('WEB_CONCURRENCY') or os.getenv('GUNICORN_WORKERS') or DEFAULT_WORKERS)
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+worker_class = 'gthread'
+
+# Import the app (and run init_db) once in the master, then fork
+preload_app = True
+
+# Recycle workers now and then to bound memory growth
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 200))
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-') or None
+errorlog = '-'
+loglevel = os.getenv('GUNICORN_LOG_LEVEL', 'info')
+
+
+def on_starting(server):
+    from utils import metrics
+    metrics.reset_directory()
+
+
+def when_ready(server):
+    # Move everything the preloaded app allocated into the permanent
+    # generation, so the collector never touches (and copies) those pages
+    # in the forked workers
+    gc.collect()
+    gc.freeze()
+
+
+def child_exit(server, worker):
+    # Keep a recycled worker's counters without keeping its file around
+    from utils import metrics
+    metrics.mark_process_dead(worker.pid)
+
+
+def on_exit(server):
+    if OWN_METRICS_DIR:
+        from utils import metrics
+        metrics.remove_directory()
+
+
+def worker_exit(server, worker):
+    # Close pooled database connections on graceful shutdown
+    from extensions import db
+    from wsgi import app
+    with app.app_context():
+        db.engine.dispose()
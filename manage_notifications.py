@@ -5,10 +5,15 @@ Provides commands for testing and managing the email notification system
 """
 
 import sys
-from app import app, db, mail, Task, User, NotificationSettings
+from app import create_app
+from extensions import db, mail
+from models import Task, User, NotificationSettings
 from utils.email_service import check_and_send_deadline_reminders
 from datetime import datetime, timedelta
 
+# Database and mail only; the CLI never loads the route modules
+app = create_app(with_routes=False)
+
 
 def test_email_config():
     """Test email configuration by sending a test email"""
@@ -238,7 +238,7 @@ class TaskNote(db.Model):
     content = db.Column(db.Text, nullable=False)
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
     
-    task_id = db.Column(db.Integer, db.ForeignKey('tasks.id'), nullable=False)
+    task_id = db.Column(db.Integer, db.ForeignKey('tasks.id'), nullable=False, index=True)
     author_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     
     # Relationships
@@ -254,8 +254,73 @@ class TaskDependency(db.Model):
     __tablename__ = 'task_dependencies'
     
     id = db.Column(db.Integer, primary_key=True)
-    task_id = db.Column(db.Integer, db.ForeignKey('tasks.id'), nullable=False)
-    depends_on_id = db.Column(db.Integer, db.ForeignKey('tasks.id'), nullable=False)
+    task_id = db.Column(db.Integer, db.ForeignKey('tasks.id'), nullable=False, index=True)
+    depends_on_id = db.Column(db.Integer, db.ForeignKey('tasks.id'), nullable=False, index=True)  # reverse lookup of dependents
     
     # Relationships
     task = db.relationship('Task', foreign_keys=[task_id], back_populates='dependencies')
+
+
+class ProjectTemplate(db.Model):
+    __tablename__ = 'project_templates'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(200), nullable=False)
+    description = db.Column(db.Text, nullable=False)
+    complexity = db.Column(db.String(20), nullable=False)
+    duration_seconds = db.Column(db.Integer, default=0)  # project deadline relative to the start date
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    source_project_id = db.Column(db.Integer, db.ForeignKey('projects.id', ondelete='SET NULL'), nullable=True)
+    created_by_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    
+    # Relationships
+    tasks = db.relationship('TemplateTask', back_populates='template', lazy=True, cascade='all, delete-orphan')
+    milestones = db.relationship('TemplateMilestone', back_populates='template', lazy=True, cascade='all, delete-orphan')
+    dependencies = db.relationship('TemplateDependency', back_populates='template', lazy=True, cascade='all, delete-orphan')
+
+
+class TemplateTask(db.Model):
+    __tablename__ = 'template_tasks'
+    __table_args__ = (db.UniqueConstraint('template_id', 'position'),)
+    
+    id = db.Column(db.Integer, primary_key=True)
+    position = db.Column(db.Integer, nullable=False)  # 1-based, contiguous within a template
+    title = db.Column(db.String(200), nullable=False)
+    description = db.Column(db.Text, nullable=True)
+    role = db.Column(db.String(50), nullable=False)
+    priority = db.Column(db.String(20), default='Medium')
+    estimated_hours = db.Column(db.Integer, default=0)
+    offset_seconds = db.Column(db.Integer, nullable=False)  # deadline relative to the start date
+    
+    template_id = db.Column(db.Integer, db.ForeignKey('project_templates.id'), nullable=False)
+    
+    # Relationships
+    template = db.relationship('ProjectTemplate', back_populates='tasks')
+
+
+class TemplateMilestone(db.Model):
+    __tablename__ = 'template_milestones'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    title = db.Column(db.String(200), nullable=False)
+    description = db.Column(db.Text, nullable=True)
+    offset_seconds = db.Column(db.Integer, nullable=False)
+    
+    template_id = db.Column(db.Integer, db.ForeignKey('project_templates.id'), nullable=False, index=True)
+    
+    # Relationships
+    template = db.relationship('ProjectTemplate', back_populates='milestones')
+
+
+class TemplateDependency(db.Model):
+    __tablename__ = 'template_dependencies'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    task_position = db.Column(db.Integer, nullable=False)
+    depends_on_position = db.Column(db.Integer, nullable=False)
+    
+    template_id = db.Column(db.Integer, db.ForeignKey('project_templates.id'), nullable=False, index=True)
+    
+    # Relationships
+    template = db.relationship('ProjectTemplate', back_populates='dependencies')
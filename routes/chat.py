@@ -2,6 +2,7 @@ from flask import Blueprint, render_template, request, flash, redirect, url_for,
 from flask_login import login_required, current_user
 from extensions import db
 from models import ChatMessage, Project, TeamMember
+from utils.access import has_project_access
 
 chat_bp = Blueprint('chat', __name__)
 # ... rest of your chat code
@@ -89,17 +90,7 @@ def get_messages(project_id):
 
 def can_access_project(project):
     """Check if current user has access to project"""
-    if current_user.role == 'manager':
-        return True
-    elif current_user.role == 'customer':
-        return project.customer_id == current_user.id
-    elif current_user.role == 'team_member':
-        from app import TeamMember
-        return TeamMember.query.filter_by(
-            project_id=project.id,
-            user_id=current_user.id
-        ).first() is not None
-    return False
+    return has_project_access(current_user, project.id)
 
 def get_role_color(role):
     """Get avatar color based on role"""
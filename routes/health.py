@@ -0,0 +1,27 @@
+from flask import Blueprint, jsonify
+from utils.health import readiness
+from utils import metrics
+
+health_bp = Blueprint('health', __name__)
+
+
+@health_bp.route('/healthz')
+def healthz():
+    """Liveness: the process is up and serving requests, no I/O"""
+    return 'ok', 200, {'Content-Type': 'text/plain', 'Cache-Control': 'no-store'}
+
+
+@health_bp.route('/readyz')
+def readyz():
+    """Readiness: database, email backlog and scheduler checks, cached briefly"""
+    ready, checks = readiness()
+    response = jsonify({'status': 'ready' if ready else 'unavailable', 'checks': checks})
+    response.status_code = 200 if ready else 503
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+
+@health_bp.route('/metrics')
+def metrics_endpoint():
+    """Prometheus metrics summed over all worker processes"""
+    return metrics.render(), 200, {'Content-Type': metrics.CONTENT_TYPE, 'Cache-Control': 'no-store'}
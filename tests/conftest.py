@@ -0,0 +1,37 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from extensions import db
+from models import User, Project
+
+
+@pytest.fixture
+def app():
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'TESTING': True}, with_routes=False)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def project(app):
+    """A project with a manager, a customer and one active team member"""
+    # Nobody logs in, so skip the password hashing
+    manager = User(name='Manager', email='manager@test.local', role='manager', password_hash='-')
+    customer = User(name='Customer', email='customer@test.local', role='customer', password_hash='-')
+    member = User(name='Member', email='member@test.local', role='team_member', password_hash='-')
+    db.session.add_all([manager, customer, member])
+    db.session.flush()
+    project = Project(title='Project', description='Test project', complexity='Medium',
+                      created_at=datetime(2026, 1, 1), deadline=datetime(2026, 1, 1) + timedelta(days=90),
+                      customer_id=customer.id, manager_id=manager.id)
+    db.session.add(project)
+    db.session.commit()
+    return project
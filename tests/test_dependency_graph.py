@@ -0,0 +1,105 @@
+from datetime import timedelta
+
+import pytest
+
+from extensions import db
+from models import Task, TaskDependency
+from utils import dependency_graph
+from utils.dependency_graph import DependencyCycleError, add_dependency, project_graph, remove_dependency
+
+
+@pytest.fixture(autouse=True)
+def clear_graphs():
+    # Version counters outlive each test's database, so cached graphs must not
+    dependency_graph._graphs.clear()
+    yield
+    dependency_graph._graphs.clear()
+
+
+@pytest.fixture
+def make_task(project):
+    def make_task(title, hours, deadline_hours=30 * 24):
+        task = Task(title=title, role='Developer', estimated_hours=hours,
+                    deadline=project.created_at + timedelta(hours=deadline_hours),
+                    project_id=project.id, created_by_id=project.manager_id)
+        db.session.add(task)
+        db.session.commit()
+        return task
+    return make_task
+
+
+@pytest.fixture
+def diamond(project, make_task):
+    """A (2h) before B (3h) and C (5h), both before D (1h) which is due 8h after the start"""
+    a, b, c = make_task('A', 2), make_task('B', 3), make_task('C', 5)
+    d = make_task('D', 1, deadline_hours=8)
+    for task, prerequisite in ((b, a), (c, a), (d, b), (d, c)):
+        add_dependency(task, prerequisite)
+    return a, b, c, d
+
+
+def test_self_dependency_is_rejected(make_task):
+    task = make_task('A', 1)
+    with pytest.raises(DependencyCycleError):
+        add_dependency(task, task)
+    assert TaskDependency.query.count() == 0
+
+
+def test_two_task_cycle_is_rejected(make_task):
+    a, b = make_task('A', 1), make_task('B', 1)
+    add_dependency(b, a)
+    with pytest.raises(DependencyCycleError):
+        add_dependency(a, b)
+    assert TaskDependency.query.count() == 1
+
+
+def test_three_task_cycle_is_rejected(make_task):
+    a, b, c = make_task('A', 1), make_task('B', 1), make_task('C', 1)
+    add_dependency(b, a)
+    add_dependency(c, b)
+    with pytest.raises(DependencyCycleError):
+        add_dependency(a, c)
+    assert TaskDependency.query.count() == 2
+
+
+def test_stored_cycle_fails_to_load(project, make_task):
+    a, b = make_task('A', 1), make_task('B', 1)
+    db.session.add_all([TaskDependency(task_id=a.id, depends_on_id=b.id),
+                        TaskDependency(task_id=b.id, depends_on_id=a.id)])
+    db.session.commit()
+    with pytest.raises(DependencyCycleError, match=f'{[a.id, b.id]}'):
+        project_graph(project.id)
+
+
+def test_diamond_schedule(project, diamond):
+    a, b, c, d = diamond
+    graph = project_graph(project.id)
+    order = [graph.task_ids[i] for i in graph.order]
+    assert order[0] == a.id and order[-1] == d.id
+    assert graph.critical_path == [a.id, c.id, d.id]
+
+    tasks = {task['id']: task for task in graph.to_dict()['tasks']}
+    assert {task_id: task['slack_hours'] for task_id, task in tasks.items()} == {
+        a.id: 0, b.id: 2, c.id: 0, d.id: 0
+    }
+    assert [task_id for task_id, task in tasks.items() if task['critical']] == [a.id, c.id, d.id]
+    assert graph.earliest_start[graph.index[d.id]] == 7
+    assert graph.latest_start[graph.index[b.id]] == 4
+    assert sorted(tasks[d.id]['depends_on']) == [b.id, c.id]
+
+
+def test_graph_is_cached_until_dependencies_change(project, diamond):
+    a, b, c, d = diamond
+    graph = project_graph(project.id)
+    assert project_graph(project.id) is graph
+
+    remove_dependency(d, c.id)
+    graph = project_graph(project.id)
+    assert graph.earliest_start[graph.index[d.id]] == 5
+    assert graph.critical_path == [a.id, c.id]
+    assert not graph.reaches(c.id, d.id)
+
+    add_dependency(d, c)
+    graph = project_graph(project.id)
+    assert graph.critical_path == [a.id, c.id, d.id]
+    assert graph.reaches(a.id, d.id)
@@ -0,0 +1,99 @@
+import multiprocessing
+import os
+import struct
+
+import pytest
+
+from utils import metrics
+from utils.metrics import Counter, Gauge, Histogram
+
+JOBS = Counter('test_jobs_total', 'Jobs run', ('result',))
+BUSY = Gauge('test_workers_busy', 'Workers running a job')
+JOB_TIME = Histogram('test_job_seconds', 'Job duration', buckets=(0.1, 1.0))
+
+HISTOGRAM = """\
+# HELP test_job_seconds Job duration
+# TYPE test_job_seconds histogram
+test_job_seconds_bucket{le="0.1"} 1
+test_job_seconds_bucket{le="1.0"} 2
+test_job_seconds_bucket{le="+Inf"} 3
+test_job_seconds_sum 4.5625
+test_job_seconds_count 3
+# HELP test_jobs_total Jobs run
+# TYPE test_jobs_total counter
+test_jobs_total{result="failed"} 1
+test_jobs_total{result="ok"} 3
+# HELP test_workers_busy Workers running a job
+# TYPE test_workers_busy gauge
+"""
+
+
+@pytest.fixture(autouse=True)
+def metrics_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, 'METRICS_DIR', str(tmp_path))
+    monkeypatch.setattr(metrics, '_values', None)
+    monkeypatch.setattr(metrics, '_values_pid', None)
+    yield tmp_path
+    if metrics._values is not None:
+        metrics._values.close()
+
+
+def worker(ready, done):
+    JOBS.inc(2, result='ok')
+    JOBS.inc(result='failed')
+    BUSY.inc()
+    JOB_TIME.observe(0.5)
+    JOB_TIME.observe(4)
+    ready.set()
+    done.wait(10)
+
+
+def test_value_file_grows_past_initial_size(metrics_dir):
+    path = str(metrics_dir / 'values.db')
+    values = metrics._ValueFile(path)
+    keys = [f'test_key_{i:05d}||' for i in range(4000)]
+    for i, key in enumerate(keys):
+        values.add(key, i)
+    values.add(keys[0], 0.5)
+    values.close()
+
+    assert os.path.getsize(path) > metrics._INITIAL_SIZE
+    with open(path, 'rb') as f:
+        assert struct.unpack('q', f.read(8))[0] <= os.path.getsize(path)
+    assert dict(metrics._read(path)) == dict({key: float(i) for i, key in enumerate(keys)}, **{keys[0]: 0.5})
+
+    reopened = metrics._ValueFile(path)
+    reopened.add(keys[-1], 1)
+    reopened.close()
+    assert dict(metrics._read(path))[keys[-1]] == 4000.0
+
+
+def test_render_sums_processes_and_drops_dead_gauges(metrics_dir):
+    context = multiprocessing.get_context('fork')
+    ready, done = context.Event(), context.Event()
+    child = context.Process(target=worker, args=(ready, done))
+    child.start()
+    try:
+        assert ready.wait(10)
+        JOBS.inc(result='ok')
+        BUSY.inc()
+        JOB_TIME.observe(0.0625)
+        assert metrics.render() == HISTOGRAM + 'test_workers_busy 2\n'
+    finally:
+        done.set()
+        child.join()
+
+    # Counters and histograms of an exited process still count, its gauges do not
+    assert metrics.render() == HISTOGRAM + 'test_workers_busy 1\n'
+
+    metrics.mark_process_dead(child.pid)
+    assert sorted(os.listdir(metrics_dir)) == sorted([metrics.ARCHIVE, f'{os.getpid()}.db'])
+    assert metrics.render() == HISTOGRAM + 'test_workers_busy 1\n'
+
+
+def test_reset_directory_removes_samples(metrics_dir):
+    JOBS.inc(result='ok')
+    metrics._values.close()
+    metrics._values_pid = None
+    metrics.reset_directory()
+    assert metrics.render() == '\n'
@@ -0,0 +1,37 @@
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.profiler import Sampler
+
+
+class Worker:
+    def spin(self, done):
+        while not done.is_set():
+            sum(range(1000))
+
+
+def test_sampler_labels_frames_of_target_thread():
+    done = threading.Event()
+    worker = threading.Thread(target=Worker().spin, args=(done,))
+    worker.start()
+    try:
+        sampler = Sampler(worker.ident, 0.001)
+        sampler.start()
+        time.sleep(0.1)
+        sampler.stop()
+    finally:
+        done.set()
+        worker.join()
+
+    assert sampler.samples > 0
+    assert sum(sampler.stacks.values()) == sampler.samples
+    stack = max(sampler.stacks, key=sampler.stacks.get)
+    leaf = stack.split(';')[-1]
+    # Qualified on 3.11+, bare function name on 3.10
+    assert leaf.split('@')[0] in ('Worker.spin', 'spin')
+    assert leaf.endswith(f'@tests/test_profiler.py:{Worker.spin.__code__.co_firstlineno}')
+    assert all(' ' not in frame for frame in stack.split(';'))
@@ -0,0 +1,147 @@
+import io
+import json
+
+import pytest
+from sqlalchemy import event
+
+from extensions import db
+from models import Task, User
+from utils import task_import
+from utils.task_import import BATCH_SIZE, CHUNK_SIZE, MalformedRow, import_tasks, iter_rows, validate_row
+
+ROW = {'title': 'Write docs', 'role': 'Technical Writer', 'deadline': '2026-03-01'}
+
+
+def rows(data, fmt):
+    return list(iter_rows(io.BytesIO(data.encode() if isinstance(data, str) else data), fmt))
+
+
+def titles(project):
+    return [task.title for task in Task.query.filter_by(project_id=project.id).order_by(Task.id)]
+
+
+def test_csv_rows_carry_their_line_numbers():
+    data = 'title,role,deadline\nA,Developer,2026-03-01\n"B, quoted",QA,2026-03-02\n'
+    assert rows(data, 'csv') == [
+        (2, {'title': 'A', 'role': 'Developer', 'deadline': '2026-03-01'}),
+        (3, {'title': 'B, quoted', 'role': 'QA', 'deadline': '2026-03-02'})
+    ]
+
+
+def test_csv_skips_utf8_bom():
+    assert rows('\ufefftitle,role\nA,Developer\n', 'csv') == [(2, {'title': 'A', 'role': 'Developer'})]
+
+
+def test_json_array_and_json_lines_give_the_same_rows():
+    values = [dict(ROW, title=f'Task {i}') for i in range(3)]
+    expected = list(enumerate(values, 1))
+    assert rows(json.dumps(values), 'json') == expected
+    assert rows('\n'.join(json.dumps(value) for value in values) + '\n', 'json') == expected
+    assert rows('[]', 'json') == []
+    assert rows('', 'json') == []
+
+
+def test_json_row_larger_than_a_chunk():
+    value = dict(ROW, description='x' * (3 * CHUNK_SIZE))
+    assert rows(json.dumps([value, ROW]), 'json') == [(1, value), (2, ROW)]
+
+
+def test_json_number_split_across_chunks(monkeypatch):
+    monkeypatch.setattr(task_import, 'CHUNK_SIZE', 8)
+    assert rows('{"estimated_hours": 123456789}\n[1]', 'json') == [
+        (1, {'estimated_hours': 123456789}), (2, [1])
+    ]
+
+
+def test_malformed_json_line_is_reported_and_parsing_resumes():
+    data = json.dumps(ROW) + '\n{"title": oops}\n' + json.dumps(ROW) + '\n'
+    parsed = rows(data, 'json')
+    assert [line for line, _ in parsed] == [1, 2, 3]
+    assert isinstance(parsed[1][1], MalformedRow)
+    assert parsed[2][1] == ROW
+
+
+def test_malformed_json_without_a_next_line_stops_the_import():
+    with pytest.raises(ValueError, match='Malformed JSON after row 1'):
+        rows('[' + json.dumps(ROW) + ', {"title": oops}]', 'json')
+
+
+def test_malformed_row_does_not_read_the_rest_of_the_stream(monkeypatch):
+    monkeypatch.setattr(task_import, 'CHUNK_SIZE', 64)
+    good = json.dumps(ROW) + '\n'
+    stream = io.BytesIO(('{"title": oops}\n' + good * 1000).encode())
+    parsed = iter_rows(stream, 'json')
+    assert isinstance(next(parsed)[1], MalformedRow)
+    assert next(parsed)[1] == ROW
+    assert stream.tell() < 4 * 64
+
+
+def test_validate_row_defaults_and_conversions():
+    values = validate_row(dict(ROW, estimated_hours='8', assignee_id='AUTO'), set())
+    assert values['priority'] == 'Medium'
+    assert values['estimated_hours'] == 8
+    assert values['assignee_id'] == task_import.AUTO
+    assert values['deadline'].isoformat() == '2026-03-01T00:00:00'
+
+
+@pytest.mark.parametrize('row, message', [
+    (MalformedRow('Malformed JSON: Expecting value'), 'Malformed JSON'),
+    (['not', 'an', 'object'], 'Row must be an object'),
+    ({'title': 'No role'}, 'required'),
+    (dict(ROW, title='x' * 201), 'longer than 200'),
+    (dict(ROW, deadline='01/03/2026'), 'YYYY-MM-DD'),
+    (dict(ROW, priority='Critical'), 'priority must be one of'),
+    (dict(ROW, estimated_hours='lots'), 'whole number'),
+    (dict(ROW, estimated_hours=-1), 'negative'),
+    (dict(ROW, assignee_id='someone'), 'must be a user id'),
+    (dict(ROW, assignee_id=99), 'not an active team member'),
+])
+def test_validate_row_rejects(row, message):
+    with pytest.raises(ValueError, match=message):
+        validate_row(row, {1})
+
+
+def test_import_skips_invalid_rows_in_each_format(project):
+    member = User.query.filter_by(role='team_member').one()
+    csv_data = ('title,role,deadline,assignee_id\n'
+                f'CSV ok,Developer,2026-03-01,{member.id}\n'
+                'CSV bad,Developer,tomorrow,\n')
+    summary = import_tasks(project.id, project.manager_id, iter_rows(io.BytesIO(csv_data.encode()), 'csv'))
+    assert (summary.imported, summary.skipped) == (1, 1)
+    assert summary.errors == [{'row': 3, 'error': 'deadline must be YYYY-MM-DD'}]
+    assert summary.assignments == {member.id: (1, ['CSV ok'])}
+
+    json_data = json.dumps(dict(ROW, title='JSON ok')) + '\n{"title": oops}\n' + json.dumps({'title': 'JSON bad'}) + '\n'
+    summary = import_tasks(project.id, project.manager_id, iter_rows(io.BytesIO(json_data.encode()), 'json'))
+    assert (summary.imported, summary.skipped) == (1, 2)
+    assert [error['row'] for error in summary.errors] == [2, 3]
+    assert titles(project) == ['CSV ok', 'JSON ok']
+
+
+def test_non_utf8_upload_imports_nothing(project):
+    # Batches before the bad byte are already flushed when decoding fails
+    good = ''.join(f'Task {i},Developer,2026-03-01\n' for i in range(CHUNK_SIZE // 20))
+    data = f'title,role,deadline\n{good}'.encode() + 'Caf\xe9,QA,2026-03-01\n'.encode('latin-1')
+    with pytest.raises(UnicodeDecodeError):
+        import_tasks(project.id, project.manager_id, iter_rows(io.BytesIO(data), 'csv'), batch_size=10)
+    assert titles(project) == []
+
+
+@pytest.mark.parametrize('count, inserts', [(BATCH_SIZE, 1), (BATCH_SIZE + 1, 2)])
+def test_rows_are_inserted_in_batches(project, count, inserts):
+    batches = []
+
+    def record(conn, cursor, statement, parameters, context, many):
+        if statement.startswith('INSERT INTO tasks'):
+            batches.append(len(parameters) if many else 1)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        data = json.dumps([dict(ROW, title=f'Task {i}') for i in range(count)])
+        summary = import_tasks(project.id, project.manager_id, iter_rows(io.BytesIO(data.encode()), 'json'))
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+    assert summary.imported == count
+    assert batches == [BATCH_SIZE, count - BATCH_SIZE][:inserts]
+    assert Task.query.filter_by(project_id=project.id).count() == count
@@ -0,0 +1,55 @@
+"""
+Project Access Cache for SupportSphere
+Keeps each user's accessible project ids in memory for authorization checks
+
+The set is built once per user from TeamMember and Project.customer_id and
+reused until invalidate_access() is called for that user, turning the
+per-request membership query on chat polls into a set lookup.
+"""
+
+import os
+
+from sqlalchemy import select, union
+
+from extensions import db
+from models import Project, TeamMember
+from utils.cache import LRUCache, bump, version
+from utils.events import team_member_added, team_member_removed
+
+_accessible = LRUCache(maxsize=int(os.getenv('ACCESS_CACHE_SIZE', 4096)))
+
+
+def accessible_project_ids(user_id):
+    """Frozen set of project ids the user belongs to as team member or customer"""
+    current = version('access', user_id)
+    entry = _accessible.get(user_id)
+    if entry is None or entry[0] != current:
+        stmt = union(
+            select(TeamMember.project_id).where(TeamMember.user_id == user_id),
+            select(Project.id).where(Project.customer_id == user_id)
+        )
+        entry = (current, frozenset(db.session.execute(stmt).scalars()))
+        _accessible.set(user_id, entry)
+    return entry[1]
+
+
+def invalidate_access(*user_ids):
+    """Drop cached project sets after membership or ownership changes"""
+    for user_id in user_ids:
+        if user_id is not None:
+            bump('access', int(user_id))
+
+
+def has_project_access(user, project_id):
+    """Check whether a user may see a project (managers see every project)"""
+    if user.role == 'manager':
+        return True
+    if user.role in ('customer', 'team_member'):
+        return project_id in accessible_project_ids(user.id)
+    return False
+
+
+@team_member_added.connect
+@team_member_removed.connect
+def _membership_changed(project_id, user_ids=(), **extra):
+    invalidate_access(*user_ids)
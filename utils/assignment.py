@@ -0,0 +1,117 @@
+"""
+Workload-aware Task Assignment for SupportSphere
+Picks an assignee for new tasks from the active team members
+
+Candidate load comes from one aggregate query over the tasks table; every
+later pick is scored in memory and updates the in-memory load, so a bulk
+import of thousands of tasks is balanced without further queries.
+"""
+
+from sqlalchemy import select, func, case
+
+from extensions import db
+from models import User, Task, TeamMember
+
+AUTO = 'auto'
+
+# Scoring weights; a role match is worth about a day and a half of queued work
+ROLE_MATCH_BONUS = 12.0
+MEMBER_BONUS = 8.0
+HOURS_WEIGHT = 1.0
+OPEN_TASK_WEIGHT = 2.0
+
+
+class Candidate:
+    """In-memory load of one team member"""
+    __slots__ = ('id', 'name', 'open_tasks', 'remaining_hours', 'roles', 'is_member', 'member_role')
+
+    def __init__(self, user_id, name):
+        self.id = user_id
+        self.name = name
+        self.open_tasks = 0
+        self.remaining_hours = 0.0
+        self.roles = set()
+        self.is_member = False
+        self.member_role = ''
+
+    def matches_role(self, role):
+        role = (role or '').lower()
+        return bool(role) and (role in self.roles or role in self.member_role)
+
+    def score(self, role):
+        score = -HOURS_WEIGHT * self.remaining_hours - OPEN_TASK_WEIGHT * self.open_tasks
+        if self.matches_role(role):
+            score += ROLE_MATCH_BONUS
+        if self.is_member:
+            score += MEMBER_BONUS
+        return score
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'name': self.name,
+            'open_tasks': self.open_tasks,
+            'remaining_hours': round(self.remaining_hours, 1),
+            'roles': sorted(self.roles),
+            'is_member': self.is_member
+        }
+
+
+def load_candidates(project_id):
+    """
+    Active team members with their current load, from a single query
+
+    Rows are grouped by (member, task role): open task count and remaining
+    hours per role, plus whether the member is on the project's team.
+    """
+    is_open = Task.status != 'Completed'
+    remaining = func.coalesce(Task.estimated_hours, 0) * (100 - func.coalesce(Task.progress, 0)) / 100.0
+    member_role = select(TeamMember.role)\
+        .where(TeamMember.project_id == project_id, TeamMember.user_id == User.id,
+               TeamMember.is_active.is_(True))\
+        .limit(1)\
+        .scalar_subquery()
+
+    rows = db.session.execute(
+        select(User.id, User.name, Task.role,
+               func.sum(case((is_open, 1), else_=0)),
+               func.sum(case((is_open, remaining), else_=0)),
+               member_role)
+        .outerjoin(Task, Task.assignee_id == User.id)
+        .where(User.role == 'team_member', User.is_active.is_(True))
+        .group_by(User.id, User.name, Task.role)
+    )
+
+    candidates = {}
+    for user_id, name, role, open_count, hours, team_role in rows:
+        candidate = candidates.get(user_id)
+        if candidate is None:
+            candidate = candidates[user_id] = Candidate(user_id, name)
+            candidate.is_member = team_role is not None
+            candidate.member_role = (team_role or '').lower()
+        if role:
+            candidate.roles.add(role.lower())
+        candidate.open_tasks += open_count or 0
+        candidate.remaining_hours += float(hours or 0)
+    return list(candidates.values())
+
+
+class AutoAssigner:
+    """
+    Chooses assignees for a stream of new tasks in one project
+
+    Each pick adds the task to the chosen member's in-memory load, so
+    consecutive picks spread work across the team.
+    """
+
+    def __init__(self, project_id):
+        self.candidates = load_candidates(project_id)
+
+    def pick(self, role, estimated_hours=0):
+        """Return the best candidate's user id for a task, or None if there is nobody"""
+        if not self.candidates:
+            return None
+        best = max(self.candidates, key=lambda candidate: (candidate.score(role), -candidate.id))
+        best.open_tasks += 1
+        best.remaining_hours += float(estimated_hours or 0)
+        return best.id
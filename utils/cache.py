@@ -0,0 +1,166 @@
+"""
+In-process Caching for SupportSphere
+Bounded LRU caches and per-entity version counters used for invalidation
+
+Writes call bump() for the entities they touch. Cache keys embed the
+current versions, so a bump makes every dependent entry unreachable and
+the LRU bound reclaims it.
+
+Cached values live in each process, but version counters live in an
+anonymous shared memory map created when this module is imported. With
+gunicorn's preload_app the master imports it before forking, so a bump in
+one worker invalidates the matching entries in every worker.
+"""
+
+import mmap
+import multiprocessing
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from datetime import datetime
+
+from flask import get_template_attribute, render_template
+from markupsafe import Markup
+
+
+class LRUCache:
+    """Thread-safe mapping that evicts the least recently used entry"""
+
+    def __init__(self, maxsize=512):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+# Entities hash into a fixed table of 64-bit counters. Two entities sharing
+# a slot only cause extra invalidations, never stale reads.
+VERSION_SLOTS = int(os.getenv('CACHE_VERSION_SLOTS', 1 << 16))
+
+_version_map = mmap.mmap(-1, VERSION_SLOTS * 8)
+_versions = memoryview(_version_map).cast('q')
+_versions_lock = multiprocessing.Lock()
+
+
+def _slot(kind, entity_id):
+    return zlib.crc32(f'{kind}:{entity_id}'.encode()) % VERSION_SLOTS
+
+
+def version(kind, entity_id=None):
+    """Current version of one entity, or of every entity of a kind when entity_id is None"""
+    return _versions[_slot(kind, entity_id)]
+
+
+def bump(kind, entity_id=None):
+    """
+    Record a write to an entity
+
+    Bumps the entity's own version and the version of its kind as a whole,
+    so both per-entity and collection-level entries are invalidated.
+    """
+    with _versions_lock:
+        if entity_id is not None:
+            _versions[_slot(kind, entity_id)] += 1
+        _versions[_slot(kind, None)] += 1
+
+
+fragment_cache = LRUCache(maxsize=int(os.getenv('FRAGMENT_CACHE_SIZE', 512)))
+
+# Rows of long lists get their own bound so they never evict whole fragments
+row_cache = LRUCache(maxsize=int(os.getenv('ROW_CACHE_SIZE', 20000)))
+
+
+def _clock():
+    """
+    Hour bucket mixed into every fragment key
+
+    Dashboards show relative values (days left, overdue badges) that change
+    with time alone, so no fragment outlives the hour it was rendered in.
+    """
+    return datetime.utcnow().strftime('%Y%m%d%H')
+
+
+def cached(name, entity_id, versions, build, cache=fragment_cache):
+    """Return the cached value for (name, entity_id, versions), building it on a miss"""
+    key = (name, entity_id, versions, _clock())
+    value = cache.get(key)
+    if value is None:
+        value = build()
+        cache.set(key, value)
+    return value
+
+
+def render_fragment(name, entity_id, versions, template_name, load):
+    """
+    Render a template fragment through the fragment cache
+
+    Args:
+        name: Fragment name
+        entity_id: Entity the fragment belongs to (None for global fragments)
+        versions: Tuple of version() values the fragment depends on
+        template_name: Template rendering the fragment
+        load: Callable returning the template context; only called on a miss,
+              so cache hits skip both the queries and the rendering
+    """
+    return cached(name, entity_id, versions,
+                  lambda: Markup(render_template(template_name, **load())))
+
+
+def render_rows(name, ids, versions, template_name, macro_name, load):
+    """
+    Render a list row by row, caching each row on its own
+
+    A write to one entity re-renders only that entity's row; the other rows
+    are served from the cache.
+
+    Args:
+        name: Fragment name
+        ids: Entity ids of the rows, in display order
+        versions: Callable returning the version tuple of one entity id
+        template_name: Template defining the row macro
+        macro_name: Macro rendering one row from its loaded entity
+        load: Callable taking the ids of uncached rows and returning {id: entity};
+              only called when at least one row is missing
+    """
+    clock = _clock()
+    keys = [(name, entity_id, versions(entity_id), clock) for entity_id in ids]
+    rows = [row_cache.get(key) for key in keys]
+    missing = [key[1] for key, row in zip(keys, rows) if row is None]
+    if missing:
+        loaded = load(missing)
+        macro = get_template_attribute(template_name, macro_name)
+        for i, key in enumerate(keys):
+            if rows[i] is None:
+                rows[i] = Markup(macro(loaded[key[1]]))
+                row_cache.set(key, rows[i])
+    return Markup(''.join(rows))
@@ -5,17 +5,66 @@ Handles all email notifications in a background-safe manner
 
 from flask import render_template_string
 from flask_mail import Message
-from threading import Thread
+from threading import Thread, Lock
+import logging
 import os
+import time
+
+from utils.log import propagate
+from utils.tracing import span, traced
+from utils.metrics import EMAILS_SENT, EMAIL_SEND_TIME, EMAIL_QUEUE
+
+logger = logging.getLogger(__name__)
+
+# Emails handed to background threads and not yet sent (or failed)
+_pending = 0
+_pending_lock = Lock()
+
+
+def _track(count):
+    global _pending
+    with _pending_lock:
+        _pending += count
+    EMAIL_QUEUE.inc(count)
+
+
+def pending_emails():
+    """Number of queued emails this process has not finished sending"""
+    return _pending
 
 
 def send_async_email(app, mail, msg):
     """Send email asynchronously to avoid blocking"""
+    start = time.perf_counter()
     with app.app_context():
         try:
             mail.send(msg)
-        except Exception as e:
-            print(f"Error sending email: {str(e)}")
+            EMAILS_SENT.inc(result='sent')
+        except Exception:
+            EMAILS_SENT.inc(result='failed')
+            logger.exception("Error sending email")
+        finally:
+            _track(-1)
+            EMAIL_SEND_TIME.observe(time.perf_counter() - start, kind='single')
+
+
+def send_async_email_batch(app, mail, messages):
+    """Send several emails over a single SMTP connection"""
+    start = time.perf_counter()
+    sent = 0
+    with app.app_context():
+        try:
+            with mail.connect() as conn:
+                for msg in messages:
+                    conn.send(msg)
+                    sent += 1
+        except Exception:
+            logger.exception("Error sending email batch")
+        finally:
+            _track(-len(messages))
+            EMAILS_SENT.inc(sent, result='sent')
+            EMAILS_SENT.inc(len(messages) - sent, result='failed')
+            EMAIL_SEND_TIME.observe(time.perf_counter() - start, kind='batch')
 
 
 def send_email(mail, app, subject, recipient, html_body, text_body=None):
@@ -23,15 +72,27 @@ def send_email(mail, app, subject, recipient, html_body, text_body=None):
     Send email with both HTML and plain text versions
     Uses threading to avoid blocking the main application
     """
-    msg = Message(
-        subject=subject,
-        recipients=[recipient] if isinstance(recipient, str) else recipient,
-        html=html_body,
-        body=text_body or html_body
-    )
-    
-    # Send asynchronously
-    Thread(target=send_async_email, args=(app, mail, msg)).start()
+    with span('email.send', **{'email.subject': subject}):
+        msg = Message(
+            subject=subject,
+            recipients=[recipient] if isinstance(recipient, str) else recipient,
+            html=html_body,
+            body=text_body or html_body
+        )
+        
+        # Send asynchronously
+        _track(1)
+        Thread(target=propagate(traced('email.deliver', send_async_email)), args=(app, mail, msg)).start()
+
+
+def send_email_batch(mail, app, messages):
+    """
+    Queue a list of Message objects as one background job
+    Uses a single thread and SMTP connection instead of one per email
+    """
+    if messages:
+        _track(len(messages))
+        Thread(target=propagate(traced('email.deliver_batch', send_async_email_batch)), args=(app, mail, messages)).start()
 
 
 def send_task_assignment_email(mail, app, task, assignee):
@@ -121,6 +182,86 @@ def send_task_assignment_email(mail, app, task, assignee):
     send_email(mail, app, subject, assignee.email, html_body, text_body)
 
 
+def send_task_digest_emails(mail, app, digests):
+    """
+    Send one grouped email per user about several tasks at once
+    Used by bulk imports and bulk task operations instead of one email per task
+    
+    Args:
+        digests: List of (recipient, subject, summary, task titles, task count)
+                 tuples; titles may be a prefix of the affected tasks
+    """
+    messages = []
+    for recipient, subject, summary, titles, count in digests:
+        more = count - len(titles)
+        
+        items_html = ''.join(f"<li>{title}</li>" for title in titles)
+        if more > 0:
+            items_html += f"<li>... and {more} more</li>"
+        items_text = '\n'.join(f"    - {title}" for title in titles)
+        if more > 0:
+            items_text += f"\n    - ... and {more} more"
+        
+        html_body = f"""
+    <html>
+    <head>
+        <style>
+            body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
+            .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
+            .header {{ background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); 
+                      color: white; padding: 30px; text-align: center; border-radius: 10px 10px 0 0; }}
+            .content {{ background: #f8f9fa; padding: 30px; border-radius: 0 0 10px 10px; }}
+            .task-details {{ background: white; padding: 20px; border-radius: 8px; margin: 20px 0; 
+                           border-left: 4px solid #667eea; }}
+            .footer {{ text-align: center; color: #6c757d; font-size: 12px; margin-top: 30px; }}
+        </style>
+    </head>
+    <body>
+        <div class="container">
+            <div class="header">
+                <h1>🎯 {subject}</h1>
+            </div>
+            <div class="content">
+                <p>Hi {recipient.name},</p>
+                <p>{summary}</p>
+                
+                <div class="task-details">
+                    <ul>{items_html}</ul>
+                </div>
+                
+                <div class="footer">
+                    <p>This is an automated notification from SupportSphere Project Management System.</p>
+                    <p>© 2024 SupportSphere. All rights reserved.</p>
+                </div>
+            </div>
+        </div>
+    </body>
+    </html>
+    """
+        
+        text_body = f"""
+    {subject}
+    
+    Hi {recipient.name},
+    
+    {summary}
+    
+{items_text}
+    
+    ---
+    This is an automated notification from SupportSphere Project Management System.
+    """
+        
+        messages.append(Message(
+            subject=subject,
+            recipients=[recipient.email],
+            html=html_body,
+            body=text_body
+        ))
+    
+    send_email_batch(mail, app, messages)
+
+
 def send_deadline_reminder_email(mail, app, task, assignee):
     """Send email reminder when task deadline is within 24 hours"""
     subject = f"⚠️ Task Deadline Reminder: {task.title}"
@@ -221,6 +362,15 @@ def send_deadline_reminder_email(mail, app, task, assignee):
 
 def send_project_status_change_email(mail, app, project, recipients, old_status, new_status):
     """Send email when project status changes"""
+    with span('email.render', template='project_status_change'):
+        subject, html_body, text_body = _project_status_change_bodies(project, old_status, new_status)
+    
+    # Send to all recipients
+    for recipient in recipients:
+        send_email(mail, app, subject, recipient.email, html_body, text_body)
+
+
+def _project_status_change_bodies(project, old_status, new_status):
     subject = f"Project Status Update: {project.title}"
     
     status_colors = {
@@ -325,10 +475,74 @@ def send_project_status_change_email(mail, app, project, recipients, old_status,
     ---
     This is an automated notification from SupportSphere Project Management System.
     """
+    return subject, html_body, text_body
+
+
+def send_team_update_email(mail, app, project, member, added):
+    """Send email when a team member is added to or removed from a project"""
+    action = 'added to' if added else 'removed from'
+    subject = f"Team Update: {project.title}"
     
-    # Send to all recipients
-    for recipient in recipients:
-        send_email(mail, app, subject, recipient.email, html_body, text_body)
+    html_body = f"""
+    <html>
+    <head>
+        <style>
+            body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
+            .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
+            .header {{ background: linear-gradient(135deg, #43e97b 0%, #38f9d7 100%); 
+                      color: white; padding: 30px; text-align: center; border-radius: 10px 10px 0 0; }}
+            .content {{ background: #f8f9fa; padding: 30px; border-radius: 0 0 10px 10px; }}
+            .project-details {{ background: white; padding: 20px; border-radius: 8px; margin: 20px 0; 
+                              border-left: 4px solid #43e97b; }}
+            .detail-row {{ margin: 10px 0; }}
+            .label {{ font-weight: bold; color: #2bb673; }}
+            .footer {{ text-align: center; color: #6c757d; font-size: 12px; margin-top: 30px; }}
+        </style>
+    </head>
+    <body>
+        <div class="container">
+            <div class="header">
+                <h1>👥 Team Update</h1>
+            </div>
+            <div class="content">
+                <p>Hi {member.name},</p>
+                <p>You have been <strong>{action}</strong> the <strong>{project.title}</strong> project team.</p>
+                
+                <div class="project-details">
+                    <h3>{project.title}</h3>
+                    <div class="detail-row">
+                        <span class="label">Status:</span> {project.status}
+                    </div>
+                    <div class="detail-row">
+                        <span class="label">Deadline:</span> {project.deadline.strftime('%B %d, %Y')}
+                    </div>
+                </div>
+                
+                <div class="footer">
+                    <p>This is an automated notification from SupportSphere Project Management System.</p>
+                    <p>© 2024 SupportSphere. All rights reserved.</p>
+                </div>
+            </div>
+        </div>
+    </body>
+    </html>
+    """
+    
+    text_body = f"""
+    Team Update
+    
+    Hi {member.name},
+    
+    You have been {action} the {project.title} project team.
+    
+    Status: {project.status}
+    Deadline: {project.deadline.strftime('%B %d, %Y')}
+    
+    ---
+    This is an automated notification from SupportSphere Project Management System.
+    """
+    
+    send_email(mail, app, subject, member.email, html_body, text_body)
 
 
 def check_and_send_deadline_reminders(mail, app, db, Task):
@@ -0,0 +1,17 @@
+"""
+Application Events for SupportSphere
+Blinker signals emitted by routes so caches and notifications can react
+to exactly what changed
+"""
+
+from blinker import Namespace
+
+_signals = Namespace()
+
+# Sent with the project id as sender and user_ids=set of affected users,
+# after the change has been committed
+team_member_added = _signals.signal('team-member-added')
+team_member_removed = _signals.signal('team-member-removed')
+
+# Sent with a tuple of the task ids that moved to Completed as sender, after commit
+task_completed = _signals.signal('task-completed')
@@ -0,0 +1,85 @@
+"""
+Readiness Checks for SupportSphere
+Backs the /readyz probe: database ping, email backlog and scheduler heartbeat
+
+The combined result is cached per process for READY_CACHE_SECONDS, so
+frequent probes from several sources cost a dictionary lookup. The database
+ping runs on a helper thread and is abandoned after READY_DB_TIMEOUT
+seconds, so a locked or unreachable database fails the probe instead of
+hanging it.
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+from flask import current_app
+from sqlalchemy import text
+
+from extensions import db
+from utils import scheduler
+from utils.email_service import pending_emails
+
+CACHE_SECONDS = float(os.getenv('READY_CACHE_SECONDS', 1.5))
+DB_TIMEOUT = float(os.getenv('READY_DB_TIMEOUT', 0.5))
+MAX_EMAIL_BACKLOG = int(os.getenv('READY_MAX_EMAIL_BACKLOG', 100))
+
+# A missed scheduler run is tolerated; two in a row mark the pod unready
+SCHEDULER_GRACE = 2
+
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='readyz')
+_cached = (0.0, None)
+
+
+def _ping(app):
+    with app.app_context():
+        with db.engine.connect() as conn:
+            conn.execute(text('SELECT 1'))
+
+
+def check_database():
+    start = time.perf_counter()
+    future = _executor.submit(_ping, current_app._get_current_object())
+    try:
+        future.result(timeout=DB_TIMEOUT)
+    except FutureTimeout:
+        return {'ok': False, 'error': f'no response within {DB_TIMEOUT:g}s'}
+    except Exception as e:
+        return {'ok': False, 'error': str(e)}
+    return {'ok': True, 'latency_ms': round((time.perf_counter() - start) * 1000, 2)}
+
+
+def check_email_backlog():
+    pending = pending_emails()
+    return {'ok': pending <= MAX_EMAIL_BACKLOG, 'pending': pending, 'limit': MAX_EMAIL_BACKLOG}
+
+
+def check_scheduler():
+    age = scheduler.heartbeat_age()
+    if age is None:
+        # Deadline reminders run from cron unless the scheduler was started here
+        return {'ok': True, 'running': False}
+    limit = scheduler.heartbeat_interval * SCHEDULER_GRACE
+    return {'ok': age <= limit, 'running': True, 'heartbeat_age_s': round(age, 1)}
+
+
+def readiness():
+    """
+    Run (or reuse) the readiness checks
+
+    Returns (ready, report) where report maps each check to its result.
+    """
+    global _cached
+    expires, result = _cached
+    now = time.monotonic()
+    if result is not None and now < expires:
+        return result
+
+    checks = {
+        'database': check_database(),
+        'email_backlog': check_email_backlog(),
+        'scheduler': check_scheduler()
+    }
+    result = (all(check['ok'] for check in checks.values()), checks)
+    _cached = (now + CACHE_SECONDS, result)
+    return result
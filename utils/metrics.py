@@ -0,0 +1,369 @@
+"""
+Prometheus Metrics for SupportSphere
+Request latency histograms, in-flight gauges and SQL, email and scheduler
+metrics, shared across gunicorn workers
+
+Every process appends its samples to its own memory-mapped file in
+METRICS_DIR, guarded by a thread lock private to that process, so workers
+never wait on each other. /metrics reads and sums the files of all
+processes. When a worker exits, the gunicorn master folds its counters and
+histograms into an archive file (see gunicorn.conf.py); gauges only count
+processes that are still alive.
+
+Without METRICS_DIR set, each process uses a directory of its own in the
+temp dir and removes it at exit.
+"""
+
+import atexit
+import bisect
+import glob
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+import threading
+import time
+
+from flask import g, request
+
+from utils import query_audit
+
+# gunicorn.conf.py points every worker at the master's directory
+METRICS_DIR = os.getenv('METRICS_DIR') or \
+    os.path.join(tempfile.gettempdir(), f'supportsphere-metrics-{os.getpid()}')
+_OWNER_PID = None if os.getenv('METRICS_DIR') else os.getpid()
+
+ARCHIVE = 'archive.db'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+_HEADER = 8
+_INITIAL_SIZE = 1 << 16
+
+_families = {}
+
+
+# ==================== VALUE FILES ====================
+
+def _entries(buf, used):
+    """(key, value offset, value) for each entry in a metrics file buffer"""
+    pos = _HEADER
+    while pos < used:
+        length = struct.unpack_from('i', buf, pos)[0]
+        key = bytes(buf[pos + 4:pos + 4 + length]).decode()
+        offset = pos + (4 + length + 7) // 8 * 8
+        yield key, offset, struct.unpack_from('d', buf, offset)[0]
+        pos = offset + 8
+
+
+def _read(path):
+    with open(path, 'rb') as f:
+        buf = f.read()
+    if len(buf) < _HEADER:
+        return []
+    used = min(struct.unpack_from('q', buf, 0)[0], len(buf))
+    return [(key, value) for key, _, value in _entries(buf, used)]
+
+
+class _ValueFile:
+    """
+    Append-only table of (key, float64) entries backed by one mmap'd file
+
+    Layout: an int64 count of used bytes, then entries of int32 key length,
+    UTF-8 key padded to 8 bytes and a float64 value. The used count is
+    written after each new entry, so readers never see a partial entry.
+    Only one process writes to a file.
+    """
+
+    def __init__(self, path):
+        self._file = open(path, 'a+b')
+        size = os.fstat(self._file.fileno()).st_size
+        if size < _INITIAL_SIZE:
+            self._file.truncate(_INITIAL_SIZE)
+            size = _INITIAL_SIZE
+        self._map = mmap.mmap(self._file.fileno(), size)
+        self._used = struct.unpack_from('q', self._map, 0)[0] or _HEADER
+        self._offsets = {key: offset for key, offset, _ in _entries(self._map, self._used)}
+
+    def add(self, key, amount):
+        offset = self._offsets.get(key) or self._append(key)
+        value = struct.unpack_from('d', self._map, offset)[0]
+        struct.pack_into('d', self._map, offset, value + amount)
+
+    def set(self, key, value):
+        offset = self._offsets.get(key) or self._append(key)
+        struct.pack_into('d', self._map, offset, value)
+
+    def keys(self):
+        return list(self._offsets)
+
+    def _append(self, key):
+        data = key.encode()
+        padded = (4 + len(data) + 7) // 8 * 8
+        needed = self._used + padded + 8
+        if needed > len(self._map):
+            size = len(self._map)
+            while size < needed:
+                size *= 2
+            self._map.close()
+            self._file.truncate(size)
+            self._map = mmap.mmap(self._file.fileno(), size)
+
+        struct.pack_into('i', self._map, self._used, len(data))
+        self._map[self._used + 4:self._used + 4 + len(data)] = data
+        offset = self._used + padded
+        struct.pack_into('d', self._map, offset, 0.0)
+        self._used = offset + 8
+        struct.pack_into('q', self._map, 0, self._used)
+        self._offsets[key] = offset
+        return offset
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+_lock = threading.Lock()
+_values = None
+_values_pid = None
+
+
+def _process_file():
+    """This process's value file, opened on first use after start or fork"""
+    global _values, _values_pid
+    if _values_pid != os.getpid():
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        _values = _ValueFile(os.path.join(METRICS_DIR, f'{os.getpid()}.db'))
+        _values_pid = os.getpid()
+        # A file left by an earlier process with the same pid keeps its
+        # counters, but its gauges described that process
+        for key in _values.keys():
+            if _kind(key) == 'gauge':
+                _values.set(key, 0.0)
+    return _values
+
+
+def _add(*pairs):
+    with _lock:
+        values = _process_file()
+        for key, amount in pairs:
+            values.add(key, amount)
+
+
+def _kind(key):
+    metric = _families.get(key.split('|', 1)[0])
+    return metric.kind if metric else None
+
+
+# ==================== METRIC TYPES ====================
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._label_text = {}
+        _families[name] = self
+
+    def _labels(self, labels):
+        values = tuple(labels.get(name, '') for name in self.labelnames)
+        text = self._label_text.get(values)
+        if text is None:
+            text = self._label_text[values] = ','.join(
+                f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, values))
+        return text
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        _add((f'{self.name}||{self._labels(labels)}', amount))
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def inc(self, amount=1, **labels):
+        _add((f'{self.name}||{self._labels(labels)}', amount))
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, help, labelnames=(), buckets=()):
+        super().__init__(name, help, labelnames)
+        self.buckets = sorted(buckets)
+
+    def observe(self, value, **labels):
+        text = self._labels(labels)
+        pairs = [(f'{self.name}|sum|{text}', value), (f'{self.name}|count|{text}', 1)]
+        # Buckets are stored individually and made cumulative on export
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            pairs.append((f'{self.name}|bucket {self.buckets[index]!r}|{text}', 1))
+        _add(*pairs)
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUEST_LATENCY = Histogram('http_request_duration_seconds', 'Request latency by endpoint',
+                            ('endpoint', 'method', 'status'), LATENCY_BUCKETS)
+REQUESTS_IN_FLIGHT = Gauge('http_requests_in_flight', 'Requests currently being served',
+                           ('endpoint',))
+REQUEST_QUERIES = Histogram('http_request_sql_queries', 'SQL statements executed per request',
+                            ('endpoint',), (0, 1, 2, 5, 10, 20, 50, 100, 200))
+REQUEST_SQL_TIME = Histogram('http_request_sql_seconds', 'Time spent in SQL per request',
+                             ('endpoint',), LATENCY_BUCKETS)
+EMAILS_SENT = Counter('emails_sent_total', 'Emails handed to the SMTP server', ('result',))
+EMAIL_SEND_TIME = Histogram('email_send_duration_seconds', 'Time to send one email job',
+                            ('kind',), (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0))
+EMAIL_QUEUE = Gauge('email_queue_depth', 'Emails queued on background threads and not yet sent')
+SCHEDULER_RUN_TIME = Histogram('scheduler_run_duration_seconds', 'Duration of scheduled job runs',
+                               ('job',), (0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0))
+
+
+# ==================== REQUEST INSTRUMENTATION ====================
+
+def _before_request():
+    g._metrics_start = time.perf_counter()
+    REQUESTS_IN_FLIGHT.inc(endpoint=request.endpoint or 'none')
+
+
+def _after_request(response):
+    g._metrics_status = response.status_code
+    return response
+
+
+def _teardown_request(exc):
+    start = g.pop('_metrics_start', None)
+    if start is None:
+        return
+    endpoint = request.endpoint or 'none'
+    status = 500 if exc is not None else g.get('_metrics_status', 500)
+    queries, sql_seconds = query_audit.request_stats()
+    REQUESTS_IN_FLIGHT.dec(endpoint=endpoint)
+    REQUEST_LATENCY.observe(time.perf_counter() - start, endpoint=endpoint,
+                            method=request.method, status=status)
+    REQUEST_QUERIES.observe(queries, endpoint=endpoint)
+    REQUEST_SQL_TIME.observe(sql_seconds, endpoint=endpoint)
+
+
+def init_app(app):
+    """Record request, in-flight and per-request SQL metrics (counted by query_audit) for an app"""
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+
+
+# ==================== COLLECTION ====================
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def collect():
+    """Sum of every sample over all processes' files"""
+    totals = {}
+    for path in glob.glob(os.path.join(METRICS_DIR, '*.db')):
+        name = os.path.basename(path)[:-3]
+        live = name.isdigit() and _alive(int(name))
+        try:
+            samples = _read(path)
+        except OSError:
+            continue
+        for key, value in samples:
+            if not live and _kind(key) == 'gauge':
+                continue
+            totals[key] = totals.get(key, 0.0) + value
+    return totals
+
+
+def _number(value):
+    return str(int(value)) if value == int(value) else repr(value)
+
+
+def _sample(name, labels, value):
+    return f'{name}{{{labels}}} {_number(value)}' if labels else f'{name} {_number(value)}'
+
+
+def render():
+    """All metrics in the Prometheus text exposition format"""
+    samples = {}
+    for key, value in collect().items():
+        name, suffix, labels = key.split('|', 2)
+        samples.setdefault(name, {}).setdefault(labels, {})[suffix] = value
+
+    lines = []
+    for name in sorted(samples):
+        metric = _families.get(name)
+        if metric is None:
+            continue
+        lines.append(f'# HELP {name} {metric.help}')
+        lines.append(f'# TYPE {name} {metric.kind}')
+        for labels, values in sorted(samples[name].items()):
+            if metric.kind != 'histogram':
+                lines.append(_sample(name, labels, values['']))
+                continue
+            prefix = f'{labels},' if labels else ''
+            cumulative = 0.0
+            for bound in metric.buckets:
+                cumulative += values.get(f'bucket {bound!r}', 0.0)
+                lines.append(f'{name}_bucket{{{prefix}le="{bound!r}"}} {_number(cumulative)}')
+            count = values.get('count', 0.0)
+            lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {_number(count)}')
+            lines.append(_sample(f'{name}_sum', labels, values.get('sum', 0.0)))
+            lines.append(_sample(f'{name}_count', labels, count))
+    return '\n'.join(lines) + '\n'
+
+
+# ==================== PROCESS LIFECYCLE ====================
+
+def reset_directory():
+    """Remove samples of earlier runs; called by the gunicorn master at startup"""
+    for path in glob.glob(os.path.join(METRICS_DIR, '*.db')):
+        os.remove(path)
+
+
+def remove_directory():
+    """Delete METRICS_DIR with everything in it"""
+    shutil.rmtree(METRICS_DIR, ignore_errors=True)
+
+
+def _remove_own_directory():
+    # Forked children inherit the handler but not the directory
+    if os.getpid() == _OWNER_PID:
+        remove_directory()
+
+
+atexit.register(_remove_own_directory)
+
+
+def mark_process_dead(pid):
+    """Fold an exited worker's counters and histograms into the archive file"""
+    path = os.path.join(METRICS_DIR, f'{pid}.db')
+    if not os.path.exists(path):
+        return
+    archive = _ValueFile(os.path.join(METRICS_DIR, ARCHIVE))
+    try:
+        for key, value in _read(path):
+            if _kind(key) != 'gauge':
+                archive.add(key, value)
+    finally:
+        archive.close()
+    os.remove(path)
@@ -0,0 +1,107 @@
+"""
+Team Workload Heatmap for SupportSphere
+Per-member, per-week planned hours built from open tasks
+
+Each open task's remaining hours (estimated_hours scaled by progress) are
+spread evenly over the time between now (or its creation, if later) and
+its deadline, then summed into calendar weeks. Overdue work lands in the
+current week. The matrix is computed with NumPy from a single query and
+cached until any assignment or task changes. NumPy is imported on first
+use, keeping it out of application startup.
+"""
+
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import select
+
+from extensions import db
+from models import Task
+from utils.cache import cached, version
+from utils.projections import user_refs
+
+DEFAULT_WEEKS = 12
+MAX_WEEKS = 52
+WEEKLY_CAPACITY = float(os.getenv('WEEKLY_CAPACITY_HOURS', 40))
+
+
+def _week_start(moment):
+    monday = moment - timedelta(days=moment.weekday())
+    return monday.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def workload_matrix(members, tasks, weeks, now):
+    """
+    Spread task hours over weekly buckets
+
+    Args:
+        members: Member ids, one matrix row each
+        tasks: (assignee_id, created_at, deadline, estimated_hours, progress) rows
+        weeks: Number of weekly buckets starting with the current week
+        now: Reference time
+
+    Returns (week start datetimes, members x weeks array of hours).
+    """
+    import numpy as np
+
+    first = _week_start(now)
+    week_starts = [first + timedelta(weeks=w) for w in range(weeks)]
+    matrix = np.zeros((len(members), weeks))
+    row_of = {member_id: row for row, member_id in enumerate(members)}
+
+    tasks = [task for task in tasks if task[0] in row_of]
+    if not tasks:
+        return week_starts, matrix
+
+    epoch = now.timestamp()
+    rows = np.fromiter((row_of[task[0]] for task in tasks), dtype=np.intp, count=len(tasks))
+    created = np.fromiter(((task[1] or now).timestamp() for task in tasks), dtype=float, count=len(tasks))
+    deadline = np.fromiter((task[2].timestamp() for task in tasks), dtype=float, count=len(tasks))
+    hours = np.fromiter(((task[3] or 0) * (100 - min(max(task[4] or 0, 0), 100)) / 100 for task in tasks),
+                        dtype=float, count=len(tasks))
+
+    # Remaining work runs from now (or a later creation) to the deadline;
+    # overdue tasks get a one-second window so they count in this week
+    start = np.maximum(created, epoch)
+    end = np.maximum(deadline, start + 1)
+
+    edges = np.array([(first + timedelta(weeks=w)).timestamp() for w in range(weeks + 1)])
+    overlap = np.minimum(end[:, None], edges[None, 1:]) - np.maximum(start[:, None], edges[None, :-1])
+    np.clip(overlap, 0, None, out=overlap)
+    share = overlap * (hours / (end - start))[:, None]
+
+    cells = rows[:, None] * weeks + np.arange(weeks)[None, :]
+    matrix += np.bincount(cells.ravel(), weights=share.ravel(), minlength=len(members) * weeks)\
+        .reshape(len(members), weeks)
+    return week_starts, matrix
+
+
+def _build(weeks):
+    members = user_refs('team_member')
+    tasks = db.session.execute(
+        select(Task.assignee_id, Task.created_at, Task.deadline, Task.estimated_hours, Task.progress)
+        .where(Task.status != 'Completed', Task.assignee_id.isnot(None))
+    ).all()
+
+    week_starts, matrix = workload_matrix([member.id for member in members], tasks, weeks,
+                                          datetime.utcnow())
+    utilization = matrix / WEEKLY_CAPACITY if WEEKLY_CAPACITY else matrix * 0
+    return {
+        'capacity_hours': WEEKLY_CAPACITY,
+        'weeks': [week.date().isoformat() for week in week_starts],
+        'members': [{
+            'id': member.id,
+            'name': member.name,
+            'hours': [round(float(value), 1) for value in matrix[row]],
+            'utilization': [round(float(value), 2) for value in utilization[row]],
+            'total_hours': round(float(matrix[row].sum()), 1),
+            'peak_utilization': round(float(utilization[row].max()), 2) if weeks else 0.0
+        } for row, member in enumerate(members)]
+    }
+
+
+def team_workload(weeks=DEFAULT_WEEKS):
+    """Cached workload heatmap data for all active team members"""
+    weeks = max(1, min(int(weeks), MAX_WEEKS))
+    versions = (version('assignee'), version('project'), version('user'))
+    return cached(('workload', weeks), None, versions, lambda: _build(weeks))